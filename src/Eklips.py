@@ -24,6 +24,7 @@ while (engine.im_running):
         engine.clock.get_delta() # Delta time variables
                                  #  engine.truedelta = can't be manipulated by game speed, good for ui
                                  #  engine.delta     = can
+        engine.ticks += 1        # Frame counter, cached transforms are recomputed once per tick
 
         # get events
         engine.display.dispatch_events()
@@ -38,8 +39,15 @@ while (engine.im_running):
             if engine.keys_pressed_dict[i]:
                 engine.keys_pressed.append(i)
         
+        # finish background loads (within a time budget)
+        engine.resource_loader.poll()
+
+        # write the save if it changed (in the background)
+        engine.savefile.update()
+
         # handle scene                                                        
         try:
+            engine.physics.step(engine.delta, engine.scene) # Fixed rate, runs 0..phys_maxsteps times
             engine.scene.update(engine.delta)
         except (BaseException, Exception) as error:
             ErrorHandler.error  = error     
@@ -49,7 +57,6 @@ while (engine.im_running):
         # handle events (most of them)                                                    
         if SOFT_QUIT in engine.events:
             engine.suicide()
-            engine.savefile.save_data()
             break
         
         # handle console                                                                  
@@ -57,7 +64,7 @@ while (engine.im_running):
             engine.console.toggle()
 
         # flip the screen
-        if engine.savefile.get("display/showfps", True):
+        if engine.show_fps:
             engine.fps_display.draw()
         engine.console.update(engine.keys_nheld, engine.keys_pressed, globals())
         engine.interface.flip()
@@ -5,7 +5,7 @@ a = Analysis(
     ['Eklips.py'],
     pathex=[],
     binaries=[],
-    datas=[('Data.py', '.'), ('ErrorHandler.py','.'), (data_directory, data_directory), ('classes','classes'),('internal','internal'),('SpecialIsResourceDataLoadable.py','.')],
+    datas=[('Data.py', '.'), ('ErrorHandler.py','.'), ('classes','classes'),('SpecialIsResourceDataLoadable.py','.'),(pack_file,'.'),*loose_files],
     hiddenimports=[],
     hookspath=[],
     hooksconfig={},
@@ -0,0 +1,159 @@
+## Import all the libraries
+from collections import OrderedDict
+import weakref
+
+## LRU cache class
+class LRUCache:
+    """
+    A dictionary with a maximum size. When it's full, the least recently used entry is evicted.
+    It also counts its hits and misses, so you can check if it's big enough. (`LRUCache.stats()`)
+    """
+
+    def __init__(self, max_size=1024):
+        self.max_size = max_size
+        self.entries  = OrderedDict()
+        self.hits     = 0
+        self.misses   = 0
+
+    def get(self, key, default=None):
+        try:
+            value = self.entries[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def pop(self, key, default=None):
+        return self.entries.pop(key, default)
+
+    def clear(self):
+        self.entries.clear()
+        self.hits   = 0
+        self.misses = 0
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "size":     len(self.entries),
+            "max_size": self.max_size,
+            "hits":     self.hits,
+            "misses":   self.misses,
+            "hit_rate": self.hits / total if total else 0
+        }
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+## Resource cache class
+class ResourceCache:
+    """
+    The resource tree of the Loader. It works like a dictionary, but it has a memory budget. (In bytes)
+
+    Every resource is kept alive by an LRU list, and also held weakly. When the LRU goes over the budget, the least
+    recently used resources are dropped from it, but they're still found while something else uses them (a node,
+    a sprite..), and only go away once nothing does. Things that can't be held weakly (bytes, strings) are dropped.
+    Pinned resources are never evicted, even by `clear()`. `reserved` bytes (like atlas textures) count against the
+    budget, but aren't held by the cache.
+    """
+
+    def __init__(self, budget=256*1024*1024, sizer=None):
+        self.budget   = budget
+        self.sizer    = sizer or (lambda value: 0)
+        self.strong   = OrderedDict()               # key -> value, in LRU order
+        self.weak     = weakref.WeakValueDictionary()
+        self.sizes    = {}                          # key -> estimated size in bytes
+        self.pinned   = {}
+        self.used     = 0                           # Bytes held by the LRU
+        self.reserved = 0                           # Bytes counted against the budget, but used outside of the LRU
+        self.evicted  = 0
+
+    def pin(self, key, value):
+        self.pinned[key] = value
+
+    def get(self, key, default=None):
+        value = self.strong.get(key)
+        if value is not None:
+            self.strong.move_to_end(key)
+            return value
+        value = self.pinned.get(key)
+        if value is not None:
+            return value
+        value = self.weak.get(key)
+        if value is not None:
+            self._hold(key, value) # Still in use somewhere, keep it again
+            return value
+        return default
+
+    def __getitem__(self, key):
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        self.pop(key)
+        self.sizes[key] = self.sizer(value)
+        try:
+            self.weak[key] = value
+        except TypeError:
+            pass # Can't be weakly referenced
+        self._hold(key, value)
+
+    def __contains__(self, key):
+        return key in self.pinned or key in self.strong or key in self.weak
+
+    def __len__(self):
+        return len(self.pinned) + len(self.strong.keys() | self.weak.keys())
+
+    def _hold(self, key, value):
+        self.strong[key] = value
+        self.used       += self.sizes.get(key, 0)
+        while self.used + self.reserved > self.budget and len(self.strong) > 1:
+            old_key, old = self.strong.popitem(last=False)
+            self.used   -= self.sizes.get(old_key, 0)
+            self.evicted += 1
+            if old_key not in self.weak:
+                self.sizes.pop(old_key, None)
+
+    def pop(self, key, default=None):
+        value = self.strong.pop(key, None)
+        if value is not None:
+            self.used -= self.sizes.get(key, 0)
+        weak_value = self.weak.pop(key, None)
+        self.sizes.pop(key, None)
+        if value is None:
+            value = weak_value
+        return default if value is None else value
+
+    def clear(self):
+        self.strong.clear()
+        self.weak.clear()
+        self.sizes.clear()
+        self.used = 0
+
+    def stats(self):
+        alive = self.strong.keys() | self.weak.keys()
+        return {
+            "size":      len(alive) + len(self.pinned),
+            "held":      len(self.strong),
+            "used":      self.used,
+            "alive":     sum(self.sizes.get(key, 0) for key in alive),
+            "reserved":  self.reserved,
+            "budget":    self.budget,
+            "evicted":   self.evicted
+        }
+
+    def largest(self, amount=10):
+        """Get the `amount` largest resources that are still alive, as (key, size in bytes)."""
+        alive = self.strong.keys() | self.weak.keys()
+        return sorted(((key, self.sizes.get(key, 0)) for key in alive), key=lambda item: item[1], reverse=True)[:amount]
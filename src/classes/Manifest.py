@@ -0,0 +1,73 @@
+## Import all the libraries
+import json, os
+from SpecialIsResourceDataLoadable import IS_IT as IS_EXECUTABLE
+
+## Scene manifests
+# A manifest is the list of every resource a scene references (sprites, scripts, media, themes..),
+# so they can all be loaded in parallel before the nodes are made. (See `Scene.load()`)
+
+MANIFEST_PATH  = "res://scenes.manifest"  # Written by compile.py for builds
+SCHEMES        = ("res://", "root://")    # Not user://, those files may not exist yet (the game writes them)
+SKIPPED_EXTS   = ("scn",)                  # Other scenes are only loaded when switching to them
+FORCED_TYPES   = {                        # (node type, property) -> the type the node loads it as
+    ("VideoPlayer", "media"): "bin",
+    ("TkWindow",    "icon"):  "bin"
+}
+
+manifests      = {}                       # (scene path, hash of the scene) -> list of resource paths
+build_manifest = None
+
+def scan(scene_data):
+    """
+    Get every resource referenced in the data of a scene, in the order they appear.
+    Resources that their node loads with a forced type are `[path, force_type]`, the others are just the path.
+    """
+    found = {}
+    stack = [(scene_data, None, None)]
+    while stack:
+        value, kind, key = stack.pop()
+        if isinstance(value, dict):
+            if isinstance(value.get("type"), str):
+                kind = value["type"]
+            stack.extend((item, kind, name) for name, item in reversed(list(value.items())))
+        elif isinstance(value, list):
+            stack.extend((item, kind, key) for item in reversed(value))
+        elif isinstance(value, str) and value.startswith(SCHEMES):
+            file = value.split("/")[-1]
+            if "." in file and file.split(".")[-1].lower() not in SKIPPED_EXTS:
+                force_type = FORCED_TYPES.get((kind, key))
+                found[(value, force_type) if force_type else value] = None
+    return [list(entry) if isinstance(entry, tuple) else entry for entry in found]
+
+def scan_directory(directory, scheme):
+    """Make the manifest of every scene in a directory. (`{"res://data/scenes/master.scn": [...]}`)"""
+    result = {}
+    for root, dirs, files in os.walk(directory):
+        for file in files:
+            if file.endswith(".scn"):
+                path     = os.path.join(root, file)
+                rel_path = os.path.relpath(path, directory).replace("\\", "/")
+                with open(path) as f:
+                    result[f"{scheme}{rel_path}"] = scan(json.load(f))
+    return result
+
+def _get_build_manifest(loader):
+    global build_manifest
+    if build_manifest is None:
+        build_manifest = {}
+        if IS_EXECUTABLE:
+            data = loader.load(MANIFEST_PATH, force_type="json")
+            if isinstance(data, str) and data != "Faulty":
+                build_manifest = json.loads(data)
+    return build_manifest
+
+def get_manifest(loader, scene_path, scene_text, scene_data):
+    """Get the manifest of a scene, from the build manifest or by scanning it once."""
+    key   = (scene_path, hash(scene_text))
+    paths = manifests.get(key)
+    if paths is None:
+        paths = _get_build_manifest(loader).get(scene_path)
+        if paths is None:
+            paths = scan(scene_data)
+        manifests[key] = paths
+    return paths
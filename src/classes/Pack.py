@@ -0,0 +1,79 @@
+## Import all the libraries
+import json, mmap, os, struct, zlib
+
+## Asset archive (.ekpak)
+# Layout:
+#   MAGIC                      6 bytes
+#   index length               uint32 (little endian)
+#   index                      JSON, {"path": [offset, length, compression]}
+#   data                       the files, offsets start after the index
+# Compression is STORED or ZLIB. Files that are already compressed (images, audio) are stored.
+
+MAGIC          = b"EKPAK1"
+STORED, ZLIB   = 0, 1
+COMPRESSED_EXT = ("png", "jpg", "jpeg", "webp", "mp3", "ogg", "flac", "mp4", "webm", "avi", "mpeg")
+
+def write_pack(out_path, files):
+    """Write an archive. `files` is {archive path (`res://..`): path on disk}."""
+    index, blobs, offset = {}, [], 0
+    for path, disk_path in files.items():
+        with open(disk_path, "rb") as f:
+            data = f.read()
+        compression = STORED
+        if path.split(".")[-1].lower() not in COMPRESSED_EXT:
+            packed = zlib.compress(data, 6)
+            if len(packed) < len(data):
+                data, compression = packed, ZLIB
+        index[path] = [offset, len(data), compression]
+        blobs.append(data)
+        offset     += len(data)
+    index = json.dumps(index).encode()
+    with open(out_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<I", len(index)))
+        f.write(index)
+        for data in blobs:
+            f.write(data)
+
+def collect(directory, prefix):
+    """Get every file in a directory as {archive path: path on disk}, with `prefix` as the archive path of the directory."""
+    files = {}
+    for root, dirs, names in os.walk(directory):
+        for name in names:
+            disk_path                = os.path.join(root, name)
+            rel_path                 = os.path.relpath(disk_path, directory).replace("\\", "/")
+            files[prefix + rel_path] = disk_path
+    return files
+
+## Pack class
+class Pack:
+    """
+    A read-only .ekpak archive, memory-mapped. `read()` gives stored files as a memoryview of the map (no copy).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "rb")
+        self.map  = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.map[:len(MAGIC)] != MAGIC:
+            raise Exception(f"{path} is not an Eklips archive.")
+        index_len  = struct.unpack_from("<I", self.map, len(MAGIC))[0]
+        index_at   = len(MAGIC) + 4
+        self.index = json.loads(bytes(self.map[index_at:index_at + index_len]))
+        self.base  = index_at + index_len
+        self.view  = memoryview(self.map)
+
+    def __contains__(self, path):
+        return path in self.index
+
+    def read(self, path):
+        offset, length, compression = self.index[path]
+        data = self.view[self.base + offset:self.base + offset + length]
+        if compression == ZLIB:
+            return zlib.decompress(data)
+        return data
+
+    def close(self):
+        self.view.release()
+        self.map.close()
+        self.file.close()
@@ -0,0 +1,345 @@
+## Import all the libraries
+from itertools import combinations
+import classes.Singleton as engine
+try:
+    import numpy as np
+    can_use_numpy = True
+except:
+    can_use_numpy = False
+    print("WARNING: Unable to use NumPy, collisions will be checked one by one")
+
+## Spatial hash class
+class SpatialHash:
+    """
+    A uniform grid used as the collision broadphase of a Scene.
+
+    Every collider is stored in each cell its rectangle touches, so a query only looks at the colliders
+    in the cells around the queried rectangle instead of every collider in the scene.
+    Colliders only have to be reinserted when they move (and only touch the grid when they change cells).
+    Moves are applied lazily, on the next query, so colliders that move every physics step don't re-hash every step.
+    """
+
+    def __init__(self, cell_size=128):
+        self.cell_size = cell_size
+        self.cells     = {} # (cell x, cell y) -> {node: None}, a dict is used as an ordered set
+        self.ranges    = {} # node -> (first cell x, first cell y, last cell x, last cell y)
+        self.moved     = {} # node -> rectangle, inserts not applied yet
+
+    def _get_range(self, x, y, w, h):
+        cs = self.cell_size
+        return int(x // cs), int(y // cs), int((x + w) // cs), int((y + h) // cs)
+
+    def insert(self, node, x, y, w, h):
+        """Insert or move a collider. It's put in its cells on the next query."""
+        self.moved[node] = (x, y, w, h)
+
+    def flush(self):
+        """Apply the inserts done since the last query."""
+        moved = self.moved
+        while moved:
+            node, rect = moved.popitem()
+            self._insert(node, *rect)
+
+    def _insert(self, node, x, y, w, h):
+        # Does nothing if it's still in the same cells
+        rng = self._get_range(x, y, w, h)
+        old = self.ranges.get(node)
+        if old == rng:
+            return
+        if old:
+            self._unlink(node, old)
+        self.ranges[node] = rng
+        cells = self.cells
+        for cx in range(rng[0], rng[2] + 1):
+            for cy in range(rng[1], rng[3] + 1):
+                cell = cells.get((cx, cy))
+                if cell is None:
+                    cell = cells[(cx, cy)] = {}
+                cell[node] = None
+
+    def remove(self, node):
+        self.moved.pop(node, None)
+        rng = self.ranges.pop(node, None)
+        if rng:
+            self._unlink(node, rng)
+
+    def _unlink(self, node, rng):
+        cells = self.cells
+        for cx in range(rng[0], rng[2] + 1):
+            for cy in range(rng[1], rng[3] + 1):
+                cell = cells.get((cx, cy))
+                if cell is None:
+                    continue
+                cell.pop(node, None)
+                if not cell:
+                    del cells[(cx, cy)]
+
+    def query(self, x, y, w, h, exclude=None):
+        """Get every collider in the cells touched by the rectangle. (Candidates, they may not overlap it)"""
+        if self.moved:
+            self.flush()
+        x0, y0, x1, y1 = self._get_range(x, y, w, h)
+        cells          = self.cells
+        found          = {}
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                cell = cells.get((cx, cy))
+                if cell:
+                    found.update(cell)
+        found.pop(exclude, None)
+        return list(found)
+
+    def clear(self):
+        self.cells.clear()
+        self.ranges.clear()
+        self.moved.clear()
+
+## Collider bounds class
+class ColliderBounds:
+    """
+    The bounds of every collider of a Scene, stored as a structure-of-arrays. (One contiguous float array per x, y, w and h)
+
+    This is the collision narrowphase: `overlapping()` checks a rectangle against a whole candidate list
+    with a single vectorized comparison, and `pairs()` finds every overlapping pair of the scene in one pass.
+    Without NumPy, the same checks are done one by one.
+    """
+
+    def __init__(self, capacity=256):
+        self.slots = {}   # node -> slot
+        self.nodes = []   # slot -> node (None if the slot is free)
+        self.free  = []
+        self.moved = {}   # slot -> rectangle, written to the arrays in one go before they're read
+        if can_use_numpy:
+            self.x     = np.zeros(capacity)
+            self.y     = np.zeros(capacity)
+            self.w     = np.zeros(capacity)
+            self.h     = np.zeros(capacity)
+            self.alive = np.zeros(capacity, dtype=bool) # slot -> if a node uses it
+        else:
+            self.x, self.y, self.w, self.h = [0.0]*capacity, [0.0]*capacity, [0.0]*capacity, [0.0]*capacity
+
+    def _grow(self):
+        capacity = len(self.x) * 2
+        if can_use_numpy:
+            self.x     = np.resize(self.x, capacity)
+            self.y     = np.resize(self.y, capacity)
+            self.w     = np.resize(self.w, capacity)
+            self.h     = np.resize(self.h, capacity)
+            self.alive = np.concatenate((self.alive, np.zeros(capacity - len(self.alive), dtype=bool)))
+        else:
+            for arr in (self.x, self.y, self.w, self.h):
+                arr.extend([0.0] * (capacity - len(arr)))
+
+    def set(self, node, x, y, w, h):
+        slot = self.slots.get(node)
+        if slot is None:
+            if self.free:
+                slot = self.free.pop()
+                self.nodes[slot] = node
+            else:
+                slot = len(self.nodes)
+                if slot >= len(self.x):
+                    self._grow()
+                self.nodes.append(node)
+            self.slots[node] = slot
+            if can_use_numpy:
+                self.alive[slot] = True
+        if can_use_numpy:
+            self.moved[slot] = (x, y, w, h)
+        else:
+            self.x[slot], self.y[slot], self.w[slot], self.h[slot] = x, y, w, h
+
+    def flush(self):
+        """Write the rectangles set since the last check to the arrays."""
+        if self.moved:
+            slots = np.fromiter(self.moved.keys(), dtype=np.intp, count=len(self.moved))
+            rects = np.array(list(self.moved.values()), dtype=float)
+            self.x[slots], self.y[slots], self.w[slots], self.h[slots] = rects.T
+            self.moved.clear()
+
+    def remove(self, node):
+        slot = self.slots.pop(node, None)
+        if slot is not None:
+            self.nodes[slot] = None
+            self.free.append(slot)
+            self.moved.pop(slot, None)
+            if can_use_numpy:
+                self.alive[slot] = False
+
+    def _mask(self, slot, others):
+        # AABB of one slot against many slots
+        self.flush()
+        x, y, w, h = self.x, self.y, self.w, self.h
+        sx, sy, sw, sh = x[slot], y[slot], w[slot], h[slot]
+        if can_use_numpy:
+            idx = np.fromiter(others, dtype=np.intp, count=len(others))
+            return (
+                (sx < x[idx] + w[idx]) &
+                (sx + sw > x[idx])     &
+                (sy < y[idx] + h[idx]) &
+                (sy + sh > y[idx])
+            ).tolist()
+        return [
+            sx < x[o] + w[o] and sx + sw > x[o] and sy < y[o] + h[o] and sy + sh > y[o]
+            for o in others
+        ]
+
+    def _check(self, node, candidates):
+        # Registered candidates are checked in one batch, others (hidden, parked or freed areas, plain rects) one by one
+        slots          = self.slots
+        slot           = slots.get(node)
+        hits           = [None] * len(candidates)
+        batch, batched = [], []
+        for i, c in enumerate(candidates):
+            try:
+                other = slots.get(c) if slot is not None else None
+            except TypeError:
+                other = None # Can't be a key, so it's not registered
+            if other is None:
+                try:
+                    hits[i] = node.x < c.x + c.w and node.x + node.w > c.x and node.y < c.y + c.h and node.y + node.h > c.y
+                except AttributeError:
+                    hits[i] = False
+            else:
+                batch.append(other)
+                batched.append(i)
+        if batch:
+            for i, hit in zip(batched, self._mask(slot, batch)):
+                hits[i] = hit
+        return hits
+
+    def overlapping(self, node, candidates):
+        """Get the candidates that overlap with `node`."""
+        return [c for c, hit in zip(candidates, self._check(node, candidates)) if hit]
+
+    def first_overlapping(self, node, candidates):
+        """Get the index of the first candidate that overlaps with `node`, or -1."""
+        for i, hit in enumerate(self._check(node, candidates)):
+            if hit:
+                return i
+        return -1
+
+    def pairs(self, grid):
+        """
+        Get every overlapping (node, node) pair.
+        With NumPy, it's a sort and sweep over the bounds arrays. Without it, the cells of a SpatialHash are the broadphase.
+        """
+        if can_use_numpy:
+            a, b = self._sweep(grid.cell_size)
+        else:
+            a, b = self._grid_pairs(grid)
+        nodes = self.nodes
+        return [(nodes[i], nodes[j]) for i, j in zip(a, b)]
+
+    def _sweep(self, cell_size):
+        # Split the colliders in horizontal bands (`cell_size` high, a collider is in every band it touches), sort them
+        # by band and then by x, and check each one only against the ones after it that start before it ends.
+        # A pair that shares more than one band is only kept in the band where their overlap starts.
+        self.flush()
+        idx    = np.flatnonzero(self.alive[:len(self.nodes)])
+        if len(idx) < 2:
+            return [], []
+        x0, y0 = self.x[idx], self.y[idx]
+        x1, y1 = x0 + self.w[idx], y0 + self.h[idx]
+        b0     = np.floor(y0 / cell_size).astype(np.intp)
+        reps   = np.floor(y1 / cell_size).astype(np.intp) - b0 + 1
+        rows   = np.repeat(np.arange(len(idx)), reps)            # Entry -> collider
+        steps  = np.arange(len(rows))
+        band   = np.repeat(b0 - np.cumsum(reps) + reps, reps) + steps
+        left   = x0.min()
+        width  = x1.max() - left + 1
+        k0     = band * width + (x0[rows] - left)                 # Sort key, bands never overlap
+        order  = np.argsort(k0)
+        rows, band, k0 = rows[order], band[order], k0[order]
+        k1     = k0 + (x1 - x0)[rows]
+        spans  = np.maximum(np.searchsorted(k0, k1) - steps - 1, 0) # How many entries after this one start before it ends
+        total  = int(spans.sum())
+        if not total:
+            return [], []
+        first  = np.repeat(steps, spans)
+        second = np.arange(total) - np.repeat(np.cumsum(spans) - spans - steps - 1, spans)
+        p, q   = rows[first], rows[second]
+        top    = np.maximum(y0[p], y0[q])
+        mask   = (
+            (x0[p] < x1[q]) & (x0[q] < x1[p])    &
+            (top < np.minimum(y1[p], y1[q]))     &
+            (band[first] == np.floor(top / cell_size))
+        )
+        return idx[p[mask]].tolist(), idx[q[mask]].tolist()
+
+    def _grid_pairs(self, grid):
+        grid.flush()
+        slots = self.slots
+        seen  = set()
+        a, b  = [], []
+        for cell in grid.cells.values():
+            if len(cell) < 2:
+                continue
+            for i, j in combinations(sorted(slots[n] for n in cell), 2):
+                if (i, j) in seen:
+                    continue
+                seen.add((i, j))
+                a.append(i)
+                b.append(j)
+        x, y, w, h = self.x, self.y, self.w, self.h
+        hits = [
+            (i, j) for i, j in zip(a, b)
+            if x[i] < x[j] + w[j] and x[i] + w[i] > x[j] and y[i] < y[j] + h[j] and y[i] + h[i] > y[j]
+        ]
+        return [i for i, _ in hits], [j for _, j in hits]
+
+    def clear(self):
+        self.slots.clear()
+        self.nodes.clear()
+        self.free.clear()
+        self.moved.clear()
+        if can_use_numpy:
+            self.alive[:] = False
+
+## Physics stepper class
+class Stepper:
+    """
+    Steps the physics of every Area2D in the scene at a fixed rate (`phys_tickrate` CVar, in Hz), whatever the framerate is.
+
+    The time left over is kept for the next frame, and `alpha` (0..1) is how far the frame is between the last
+    two steps, so bodies can be rendered interpolated. At most `phys_maxsteps` steps are run in a frame; anything
+    over that is dropped so a slow frame can't snowball into more and more steps. (Spiral of death)
+    The bodies stepped are the ones the last scene update ran (`Scene.bodies`), so process modes apply to physics too.
+    The contacts of a step are found for every body at once (`Scene.get_overlapping_pairs()`), before any of them moves.
+    """
+
+    def __init__(self):
+        self.tickrate    = engine.cvars.get("phys_tickrate", 60)
+        self.max_steps   = engine.cvars.get("phys_maxsteps", 5)
+        self.step_time   = 1 / self.tickrate
+        self.accumulator = 0
+        self.alpha       = 0
+        self.ticks       = 0
+
+    def step(self, delta, scene):
+        self.accumulator += delta
+        steps             = 0
+        while self.accumulator >= self.step_time:
+            if steps >= self.max_steps:
+                self.accumulator %= self.step_time
+                break
+            self._step_bodies(scene)
+            self.accumulator -= self.step_time
+            self.ticks       += 1
+            steps            += 1
+        self.alpha        = self.accumulator / self.step_time
+        return steps
+
+    def _step_bodies(self, scene):
+        # Every contact of the step comes from a single batched pass over the scene, then goes to each body
+        # Bodies that didn't move since the last step (`remap_dim()` compares their rectangle) aren't touched
+        bodies   = [body for body in scene.bodies if not body.stop_running]
+        for body in bodies:
+            body.remap_dim()
+        contacts = {}
+        for a, b in scene.get_overlapping_pairs():
+            contacts.setdefault(a, []).append(b)
+            contacts.setdefault(b, []).append(a)
+        for body in bodies:
+            if not body.stop_running:
+                body._physics_process(self.step_time, contacts.get(body, ()))
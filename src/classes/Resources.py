@@ -1,16 +1,56 @@
 ## Import all the libraries
-import pyglet as pg, gc, struct, types, sys, io
-import pygame as pyg, json
+import pyglet as pg, gc, struct, types, sys, io, os
+import pygame as pyg, json, hashlib, marshal, importlib.util, time
+from concurrent.futures import ThreadPoolExecutor
+from pyglet.image.atlas import TextureBin, AllocatorException
+from PIL import Image as PILImage
 from pygame.mixer import Sound
 from anytree import NodeMixin
 from classes.Constants import *
 from classes.Object import Object
+from classes.Cache import ResourceCache
+from classes import Pack
 from SpecialIsResourceDataLoadable import IS_IT as IS_EXECUTABLE
 import classes.Singleton as engine
 
 ## Mixer
 pyg.mixer.init()
 
+## Compiled scripts
+compiled_scripts = {} # (path, hash of the path and contents) -> code object
+
+def compile_script(path, contents):
+    """
+    Compile a script once per path and contents, and get its code object.
+    If the `scr_diskcache` CVar is on, code objects are also saved in the save directory, so they don't have to be
+    compiled again on the next start. (Just like `__pycache__`)
+    """
+    digest = hashlib.sha1(f"{path}\0{contents}".encode()).hexdigest()
+    code   = compiled_scripts.get((path, digest))
+    if code is None:
+        use_disk  = engine.cvars.get("scr_diskcache", False)
+        cache_dir = f"{engine.savefile.save_dir}/__eklcache__"
+        cache_fn  = f"{cache_dir}/{digest}.eklc"
+        if use_disk:
+            try:
+                with open(cache_fn, "rb") as f:
+                    if f.read(len(importlib.util.MAGIC_NUMBER)) == importlib.util.MAGIC_NUMBER:
+                        code = marshal.loads(f.read())
+            except:
+                code = None
+        if code is None:
+            code = compile(contents, path, "exec")
+            if use_disk:
+                try:
+                    os.makedirs(cache_dir, exist_ok=True)
+                    with open(cache_fn, "wb") as f:
+                        f.write(importlib.util.MAGIC_NUMBER)
+                        f.write(marshal.dumps(code))
+                except:
+                    print(f"Warning; Could not cache compiled script {path}")
+        compiled_scripts[(path, digest)] = code
+    return code
+
 ## Resources
 global_res_len = 0
 class Resource(Object):
@@ -149,18 +189,26 @@ class Script(Resource):
         super().__init__(data)
         self.scriptpath = self.data["path"]
         self.contents   = self.data["object"]
-        self.namespace = {}
+        self.namespace  = {}
+        self.code       = None
+    
+    def get_code(self):
+        """Get the compiled code of this script. It's only compiled once, then shared by every node using it."""
+        if self.code is None:
+            self.code = compile_script(self.scriptpath, self.contents)
+        return self.code
     
     def init_param(self, properties):
+        """Run the script in a fresh namespace, with the properties of a node as globals. Returns the namespace."""
         if self.scriptpath and self.data.get("lang","ekl").lower() != "plaintext":
-            script_glb           = locals()
+            script_glb           = {"self": self, "properties": properties}
             script_glb["engine"] = engine
             for i in properties:
                 script_glb[i]    = properties[i]
             
-            script_contents      = self.contents
-            exec(script_contents, globals=script_glb,locals=script_glb)
+            exec(self.get_code(), script_glb, script_glb)
             self.namespace       = script_glb
+        return self.namespace
     
     def _init_script(self):
         pass
@@ -221,7 +269,84 @@ class Theme(Resource):
     
     def get_thing(self, name): return self.get()["themed"][name]
     
-    def draw_marginable_thing(self, name, pos, size, blit_in, anchor, layer, rot=0,batch=None):
+    def _get_slices(self, thing, pos, size):
+        # The 9 pieces as [x, y, w, h] on screen and [x, y, w, h] in the atlas, both from the top left
+        margin       = thing["margin"]
+        tx, ty       = thing["atlaspos"][:2]
+        dw, dh       = thing["atlaspos"][2:]
+        x, y         = pos
+        sw, sh       = size
+        return (
+            ((x+margin,    y+margin,    sw,     sh),     (tx+margin,    ty+margin,    1,      1)),      # Fill
+            ((x+margin,    y,           sw,     margin), (tx+margin,    ty,           margin, margin)), # Top side
+            ((x+margin,    y+sh+margin, sw,     margin), (tx+margin,    ty+dh-margin, margin, margin)), # Bottom side
+            ((x,           y+margin,    margin, sh),     (tx,           ty+margin,    margin, margin)), # Left side
+            ((x+sw+margin, y+margin,    margin, sh),     (tx+dw-margin, ty+margin,    margin, margin)), # Right side
+            ((x,           y,           margin, margin), (tx,           ty,           margin, margin)), # Top left corner
+            ((x+sw+margin, y,           margin, margin), (tx+dw-margin, ty,           margin, margin)), # Top right corner
+            ((x,           y+sh+margin, margin, margin), (tx,           ty+dh-margin, margin, margin)), # Bottom left corner
+            ((x+sw+margin, y+sh+margin, margin, margin), (tx+dw-margin, ty+dh-margin, margin, margin))  # Bottom right corner
+        )
+    
+    def _draw_nine_slice(self, handle, name, pos, size, blit_in, anchor, layer, rot):
+        ui           = engine.interface
+        if blit_in  == MAIN_SCREEN:
+            blit_in  = ui.main_surf_id
+        screen       = ui.surfaces[blit_in]["screen"]
+        win_h        = screen.height
+        key          = (self, name, pos[0], pos[1], size[0], size[1], blit_in, anchor, layer, rot, screen.width, win_h)
+        if key == handle.key:
+            return size
+        
+        thing        = self.get_thing(name)
+        margin       = thing["margin"]
+        pos          = ui.get_anchor(pos[:], blit_in, anchor, size[0]+margin, size[1]+margin, True, rot, True)
+        slices       = self._get_slices(thing, pos, size)
+
+        # Remake the vertex list only if the texture/group changed
+        group_key    = (self, name, blit_in, layer)
+        if group_key != handle.group_key:
+            handle.delete()
+            texture        = self.atlas.get().get_texture()
+            handle.regions = [
+                texture.get_region(cx, self.atlas.height - cy - ch, cw, ch).tex_coords
+                for _, (cx, cy, cw, ch) in slices
+            ]
+            if not layer in ui.layers: layer = 0
+            parent         = ui.layers[layer]
+            if handle.order:
+                parent     = pg.graphics.Group(order=handle.order, parent=parent)
+            program        = pg.sprite.get_default_shader()
+            group          = pg.sprite.SpriteGroup(texture, pg.gl.GL_SRC_ALPHA, pg.gl.GL_ONE_MINUS_SRC_ALPHA, program, parent)
+            count          = len(slices) * 4
+            handle.vlist   = program.vertex_list_indexed(
+                count, pg.gl.GL_TRIANGLES,
+                [i*4 + j for i in range(len(slices)) for j in (0, 1, 2, 0, 2, 3)],
+                ui.surfaces[blit_in]["batch"], group,
+                position   = ("f", (0,) * count * 3),
+                colors     = ("Bn", (255, 255, 255, 255) * count),
+                translate  = ("f", (0, 0, 0) * count),
+                scale      = ("f", (1, 1) * count),
+                rotation   = ("f", (0,) * count),
+                tex_coords = ("f", [c for region in handle.regions for c in region])
+            )
+            handle.group_key = group_key
+
+        # Pyglet uses bottom-left for 0,0, so flip every piece
+        vertices     = []
+        for (x, y, w, h), _ in slices:
+            y0 = win_h - y - h
+            vertices.extend((x, y0, 0, x+w, y0, 0, x+w, y0+h, 0, x, y0+h, 0))
+        handle.vlist.position[:] = vertices
+        handle.key   = key
+        handle.size  = size
+        return size
+    
+    def draw_marginable_thing(self, name, pos, size, blit_in, anchor, layer, rot=0,batch=None,handle=None):
+        """
+        Draw a themed thing (button, progressbar..) with its margins (9-slice).
+        If a `UI.NineSlice` handle is passed, it's drawn as one cached vertex list instead of nine blits.
+        """
         thing  = self.get_thing(name)
         margin = thing["margin"]
         tpos   = thing["atlaspos"][:2]
@@ -230,6 +355,9 @@ class Theme(Resource):
             size[0] = margin*2
         if size[1] < margin:
             size[1] = margin*2
+        
+        if handle:
+            return self._draw_nine_slice(handle, name, pos, size, blit_in, anchor, layer, rot)
 
         ppos = pos[:]
         pos  = engine.interface.get_anchor(ppos, blit_in, anchor, size[0]+margin, size[1]+margin, True, rot, True)
@@ -407,29 +535,110 @@ def img_to_sheet(img, clip = 0):
 
     return ims
 
+## Memory accounting
+def get_resource_size(resource):
+    """Estimate how many bytes a loaded resource takes. (Pixels of images, samples of sounds, length of data)"""
+    obj = resource.data.get("object") if isinstance(resource, Resource) else resource
+    if isinstance(resource, SheetImage):
+        return 0 # Shares the pixels of the image it's clipped from
+    if isinstance(obj, pg.image.TextureRegion):
+        return 0 # In an atlas, the atlas textures are counted instead (`Loader.get_atlas_size()`)
+    if isinstance(obj, (bytes, str)):
+        return len(obj)
+    if isinstance(obj, pg.image.AbstractImage):
+        return obj.width * obj.height * 4
+    if isinstance(obj, Sound):
+        mixer = pyg.mixer.get_init()
+        if mixer:
+            freq, size, channels = mixer
+            return int(obj.get_length() * freq * channels * abs(size) // 8)
+    if isinstance(obj, dict):
+        return len(json.dumps(obj))
+    return 256
+
+## Background loading classes
+class LoadHandle:
+    """
+    A resource being loaded in the background, returned by `Loader.load_async()`.
+    `done` turns True (and `on_loaded` callbacks are called) on the main thread, once the resource is ready to use.
+    """
+
+    def __init__(self, path, location, ext, name):
+        self.path         = path
+        self.location     = location
+        self.ext          = ext
+        self.name         = name
+        self.future       = None
+        self.resource     = None
+        self.error        = None
+        self.done         = False
+        self.on_loaded    = []
+    
+    def get(self):
+        """Get the resource, or None if it's not loaded yet."""
+        return self.resource
+    
+    def wait(self):
+        """Finish loading right now (blocking) and get the resource."""
+        if not self.done:
+            engine.resource_loader._finish(self)
+        return self.resource
+
+class LoadGroup:
+    """Many resources being loaded in the background, returned by `Loader.preload()`. Good for loading screens."""
+
+    def __init__(self, handles):
+        self.handles = handles
+    
+    @property
+    def loaded(self):
+        return sum(1 for handle in self.handles if handle.done)
+    
+    @property
+    def progress(self):
+        """How much of the group is loaded, from 0 to 1."""
+        return self.loaded / len(self.handles) if self.handles else 1
+    
+    @property
+    def done(self):
+        return all(handle.done for handle in self.handles)
+    
+    def wait(self):
+        return [handle.wait() for handle in self.handles]
+
 ## Loader class
 class Loader:
     def __init__(self):
         self.game_data     = engine.cvars
         self.save          = engine.savefile
-        self.resource_tree = {
-            f"Ekl{engine.VER}mem,..unknown": Image({
-                "prop":   {},
-                "data":   {
-                    "object": pg.image.ImageData(
-                        25, 25,
-                        'RGB',
-                        bytes([0, 0, 0] * 25 * 25)
-                    ),
-                    "path":   f"mem://unknown"
-                },
-                "meta":   {
-                    "kind": "Resource",
-                    "name": "Image"
-                },
-                "script": None
-            })
-        }
+        self.resource_tree = ResourceCache(self.game_data.get("res_cachebudget_mb", 256) * 1024 * 1024, get_resource_size)
+        self.resource_tree.pin("mem://unknown", Image({
+            "prop":   {},
+            "data":   {
+                "object": pg.image.ImageData(
+                    25, 25,
+                    'RGB',
+                    bytes([0, 0, 0] * 25 * 25)
+                ),
+                "path":   f"mem://unknown"
+            },
+            "meta":   {
+                "kind": "Resource",
+                "name": "Image"
+            },
+            "script": None
+        }))
+        self.pending       = {} # location -> LoadHandle, for resources loading in the background
+        self.executor      = None
+        self.path_info     = {} # (path, forced type) -> (location, ext, name, actual path)
+        self.atlas         = None # TextureBin for small images, made on the first one
+        self.atlas_regions = {}   # path -> region of the atlas
+        self.archive       = None # Packed assets (.ekpak), `res://` and `root://` paths are read from it first
+        pack_path          = self.game_data.get("res_pack", "game.ekpak")
+        if IS_EXECUTABLE:
+            pack_path      = f"{sys._MEIPASS}/{pack_path}"
+        if os.path.isfile(pack_path):
+            self.archive   = Pack.Pack(pack_path)
     
     def load_from_resf(self,data):
         """
@@ -541,196 +750,417 @@ class Loader:
         If True, this function will return the Resource object and its ID in the Loader class.
         """
 
-        asset       = 0
-        typeres     = "mem"
-        location    = f"Ekl{engine.VER}{path}".replace('/','.').replace(':',',')
-        actual_path = location
-        name        = path.split("/")[-1].split(".")[0]
-        ext         = path.split(".")[-1].lower()
-        if force_type:
-            ext      = force_type
-            location = f"Ekl{engine.VER}{path}::forced::{ext}".replace('/','.').replace(':',',')
+        if can_cache and not force_type:
+            # Fast path, resources loaded without a forced type are kept under their own path
+            asset = self.resource_tree.get(path)
+            if asset is not None:
+                return (asset, path) if return_identifier else asset
+
+        location, ext, name, actual_path = self._get_location(path, force_type)
         if can_cache:
-            if location in self.resource_tree:
-                asset = self.resource_tree[location]
-                return asset
+            asset = self.resource_tree.get(location)
+            if asset is not None:
+                return (asset, location) if return_identifier else asset
+            elif location in self.pending:
+                # Already loading in the background, finish it now
+                assetres = self.pending[location].wait()
             else:
                 print(f"  ~ Loading file {path}")
-                if path.startswith("root://"):
-                    actual_path = path.lstrip("root://")
-                elif path.startswith("user://"):
-                    actual_path = self.save + path.lstrip("user://")
-                elif path.startswith("res://"):
-                    actual_path = self.game_data.get("directory") + "/" + path.lstrip("res://")
-                else:
-                    actual_path = path
                 try:
-                    if IS_EXECUTABLE:
-                        if ext in ("png","jpg","jpeg","webp","bmp"):
-                            asset    = pg.resource.image(actual_path)
-                            assetres = Image({
-                                "prop":   {},
-                                "data":   {
-                                    "object": asset,
-                                    "path":   path
-                                },
-                                "meta":   {
-                                    "kind": "Resource",
-                                    "name": "Image"
-                                },
-                                "script": None
-                            })
-                        elif ext in ("ttf","otf"):
-                            asset    = pg.resource.add_font(actual_path)
-                            assetres = Media({
-                                "prop":   {},
-                                "data":   {
-                                    "object": asset,
-                                    "path":   path
-                                },
-                                "meta":   {
-                                    "kind": "Resource",
-                                    "name": "Media"
-                                },
-                                "script": None
-                            })
-                        elif ext in ("mp3","ogg","wav","mp4","webm","flac","avi","mpeg"):
-                            asset    = Sound(f"{sys._MEIPASS}/{actual_path}")
-                            assetres = Media({
-                                "prop":   {},
-                                "data":   {
-                                    "object": asset,
-                                    "path":   path
-                                },
-                                "meta":   {
-                                    "kind": "Resource",
-                                    "name": "Media"
-                                },
-                                "script": None
-                            })
-                        elif ext in ("res", "import"):
-                            asset    = pg.resource.file(actual_path, "rb")
-                            assetres = self.load_from_resf(asset)
-                        elif ext in ("ekl", "py", "scn"):
-                            asset    = pg.resource.file(actual_path).read()
-                            assetres = Script({
-                                "prop":   {},
-                                "data":   {
-                                    "object": asset,
-                                    "lang":   "python/ekl",
-                                    "path":   path
-                                },
-                                "meta":   {
-                                    "kind": "Resource",
-                                    "name": "Script/PlainText"
-                                },
-                                "script": None
-                            })
-                        elif ext == "bin":
-                            asset    = pg.resource.file(actual_path, "rb").read()
-                            assetres = asset
-                        elif ext == "std":
-                            asset    = pg.resource.file(actual_path, "rb")
-                            assetres = asset
-                        else:
-                            asset    = pg.resource.file(actual_path, "r").read()
-                            assetres = asset
-                    else:
-                        if ext in ("png","jpg","jpeg","webp","bmp","dds"):
-                            asset    = pg.image.load(actual_path)
-                            assetres = Image({
-                                "prop":   {},
-                                "data":   {
-                                    "object": asset,
-                                    "path":   path
-                                },
-                                "meta":   {
-                                    "kind": "Resource",
-                                    "name": "Image"
-                                },
-                                "script": None
-                            })
-                        elif ext in ("ttf","otf"):
-                            asset    = pg.font.load(name)
-                            assetres = Media({
-                                "prop":   {},
-                                "data":   {
-                                    "object": asset,
-                                    "path":   path
-                                },
-                                "meta":   {
-                                    "kind": "Resource",
-                                    "name": "Media"
-                                },
-                                "script": None
-                            })
-                        elif ext in ("mp3","ogg","wav","mp4","webm","avi","mpeg"):
-                            asset    = Sound(actual_path)
-                            assetres = Media({
-                                "prop":   {},
-                                "data":   {
-                                    "object": asset,
-                                    "path":   path
-                                },
-                                "meta":   {
-                                    "kind": "Resource",
-                                    "name": "Media"
-                                },
-                                "script": None
-                            })
-                        elif ext in ("res", "import"):
-                            asset    = open(actual_path,"rb")
-                            assetres = self.load_from_resf(asset)
-                        elif ext in ("ekl", "py", "scn"):
-                            asset    = open(actual_path).read()
-                            assetres = Script({
-                                "prop":   {},
-                                "data":   {
-                                    "object": asset,
-                                    "lang":   "python/ekl",
-                                    "path":   path
-                                },
-                                "meta":   {
-                                    "kind": "Resource",
-                                    "name": "Script/PlainText"
-                                },
-                                "script": None
-                            })
-                        elif ext == "bin":
-                            asset    = open(actual_path, "rb").read()
-                            assetres = asset
-                        elif ext == "std":
-                            asset    = open(actual_path, "rb")
-                            assetres = asset
-                        else:
-                            asset    = open(actual_path).read()
-                            assetres = asset
+                    assetres = self._read(path, actual_path, ext, name)
                 except:
-                    if ext == "bin":
-                        assetres = b"Faulty"
-                    elif ext in ("png","jpg","jpeg","webp","bmp","dds"):
-                        assetres = self.resource_tree[f"Ekl{engine.VER}mem,..unknown"]
-                    elif ext in ("res", "import"):
-                        asset    = io.BytesIO(b"RES")
-                        assetres = self.load_from_resf(asset)
-                    elif ext in ("ekl", "py", "scn"):
-                        asset    = "# Faulty"
-                        assetres = Script({
-                            "prop":   {},
-                            "data":   {
-                                "object": asset,
-                                    "lang":   "python/ekl",
-                                    "path":   path
-                                },
-                                "meta":   {
-                                    "kind": "Resource",
-                                    "name": "Script/PlainText"
-                                },
-                                "script": None
-                            })
-                    else:
-                        assetres = "Faulty"                
+                    assetres = self._get_faulty(path, ext)
                 self.resource_tree[location] = assetres
-                if return_identifier:
-                    return assetres, location
-                return assetres
\ No newline at end of file
+            if return_identifier:
+                return assetres, location
+            return assetres
+    
+    def load_async(self, path, force_type=None, callback=None):
+        """
+        Load a resource in the background, and get a `LoadHandle` for it.
+        Files are read and decoded on a thread pool (`res_loadthreads` CVar), then turned into resources on the main
+        thread by `poll()`, which spends at most `res_uploadbudget_ms` per frame on it. (Uploading textures, mostly)
+        `callback(resource)` is called on the main thread once it's loaded.
+        """
+        location, ext, name, actual_path = self._get_location(path, force_type)
+        handle                           = self.pending.get(location)
+        if handle is None:
+            handle   = LoadHandle(path, location, ext, name)
+            resource = self.resource_tree.get(location)
+            if resource is not None:
+                handle.resource = resource
+                handle.done     = True
+            else:
+                print(f"  ~ Loading file {path} in the background")
+                if self.executor is None:
+                    self.executor = ThreadPoolExecutor(self.game_data.get("res_loadthreads", 4), "EklipsLoader")
+                handle.future          = self.executor.submit(self._decode, path, actual_path, ext)
+                self.pending[location] = handle
+        if callback:
+            if handle.done:
+                callback(handle.resource)
+            else:
+                handle.on_loaded.append(callback)
+        return handle
+    
+    def preload(self, paths):
+        """
+        Load many resources in the background, and get a `LoadGroup` to follow their progress.
+        An entry can also be `[path, force_type]`. (Like in scene manifests)
+        """
+        return LoadGroup([self.load_async(*path) if isinstance(path, (list, tuple)) else self.load_async(path) for path in paths])
+    
+    def poll(self, budget_ms=None):
+        """Finish the background loads that are ready, for at most `budget_ms`. Called once per frame by the main loop."""
+        if not self.pending:
+            return
+        if budget_ms is None:
+            budget_ms = self.game_data.get("res_uploadbudget_ms", 4)
+        deadline = time.perf_counter() + budget_ms / 1000
+        for handle in list(self.pending.values()):
+            if handle.future.done():
+                self._finish(handle)
+                if time.perf_counter() >= deadline:
+                    break
+    
+    def close(self):
+        """Drop the background loads that haven't started, and close the pack. (Quitting, reloading)"""
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+        self.pending.clear()
+        if self.archive:
+            self.archive.close()
+            self.archive = None
+    
+    def _decode(self, path, actual_path, ext):
+        # Runs on a loader thread, don't touch the resource tree or GL here
+        # Returns what the main thread needs to make the resource, or None if it has to be loaded there
+        data = self.archive.read(path) if self.archive and path in self.archive else None
+        if ext in ("png","jpg","jpeg","webp","bmp"):
+            if data is not None:
+                img = PILImage.open(io.BytesIO(data))
+            elif IS_EXECUTABLE:
+                img = PILImage.open(pg.resource.file(actual_path, "rb"))
+            else:
+                img = PILImage.open(actual_path)
+            img = img.convert("RGBA")
+            return pg.image.ImageData(img.width, img.height, "RGBA", img.tobytes(), -img.width * 4) # Rows go top to bottom
+        if ext in ("mp3","ogg","wav","mp4","webm","flac","avi","mpeg"):
+            if data is not None:
+                return Sound(io.BytesIO(data))
+            return Sound(f"{sys._MEIPASS}/{actual_path}" if IS_EXECUTABLE else actual_path)
+        if data is not None:
+            return bytes(data)
+        if ext in ("res", "import", "bin", "ekl", "py", "scn"):
+            if IS_EXECUTABLE:
+                return pg.resource.file(actual_path, "rb").read()
+            with open(actual_path, "rb") as f:
+                return f.read()
+        return None
+    
+    def _make_resource(self, path, ext, name, decoded):
+        # Runs on the main thread, turns what `_decode()` returned into a resource
+        if decoded is None:
+            return self._read(path, self._resolve_path(path), ext, name, False)
+        if ext in ("png","jpg","jpeg","webp","bmp","dds"):
+            if ext == "dds":
+                decoded = pg.image.load(path, file=io.BytesIO(decoded))
+            packed = self._pack(decoded, path)
+            if packed is decoded:
+                decoded.get_texture() # Upload it now, instead of on the first draw
+            return Image({
+                "prop":   {},
+                "data":   {
+                    "object": packed,
+                    "path":   path
+                },
+                "meta":   {
+                    "kind": "Resource",
+                    "name": "Image"
+                },
+                "script": None
+            })
+        if ext in ("res", "import"):
+            return self.load_from_resf(io.BytesIO(decoded))
+        if ext == "bin":
+            return decoded
+        if ext == "std":
+            return io.BytesIO(decoded)
+        if ext in ("ekl", "py", "scn"):
+            return Script({
+                "prop":   {},
+                "data":   {
+                    "object": decoded.decode(),
+                    "lang":   "python/ekl",
+                    "path":   path
+                },
+                "meta":   {
+                    "kind": "Resource",
+                    "name": "Script/PlainText"
+                },
+                "script": None
+            })
+        if ext in ("ttf","otf"):
+            pg.font.add_file(io.BytesIO(decoded))
+            decoded = pg.font.load(name)
+        elif isinstance(decoded, bytes):
+            return decoded.decode()
+        return Media({
+            "prop":   {},
+            "data":   {
+                "object": decoded,
+                "path":   path
+            },
+            "meta":   {
+                "kind": "Resource",
+                "name": "Media"
+            },
+            "script": None
+        })
+    
+    def _finish(self, handle):
+        # Runs on the main thread
+        path, location, ext, name = handle.path, handle.location, handle.ext, handle.name
+        try:
+            assetres = self._make_resource(path, ext, name, handle.future.result())
+            self.resource_tree[location] = assetres
+        except Exception as error:
+            # Not cached, so a later `load()` tries again (the file may not exist yet)
+            handle.error = error
+            assetres     = self._get_faulty(path, ext)
+        self.pending.pop(location, None)
+        handle.resource = assetres
+        handle.done     = True
+        for callback in handle.on_loaded:
+            callback(assetres)
+        handle.on_loaded.clear()
+    
+    def _pack(self, image, path):
+        """
+        Put a small image (up to `res_atlas_maxsize` pixels wide and high, 0 to turn it off) in a shared atlas texture,
+        and get its region. Sprites of different images in the same atlas are drawn in the same batch call.
+        Bigger images (or when the atlas is full) are returned as they are. Builds already do this with `pg.resource`.
+        Each path keeps its region, so loading an image again doesn't grow the atlas.
+        """
+        max_size = self.game_data.get("res_atlas_maxsize", 256)
+        if not max_size or image.width > max_size or image.height > max_size:
+            return image
+        region   = self.atlas_regions.get(path)
+        if region is not None and (region.width, region.height) == (image.width, image.height):
+            # Loaded again (evicted, or `memcl`), reuse its region instead of taking more of the atlas
+            region.blit_into(image, 0, 0, 0)
+            return region
+        if self.atlas is None:
+            self.atlas = TextureBin()
+        try:
+            region = self.atlas.add(image, border=1) # The border keeps filtering from bleeding into other images
+        except AllocatorException:
+            return image
+        self.atlas_regions[path]    = region
+        self.resource_tree.reserved = self.get_atlas_size()
+        return region
+    
+    def get_atlas_size(self):
+        """How many bytes the atlas textures take. They're counted against the cache budget, but never evicted."""
+        if self.atlas is None:
+            return 0
+        return sum(atlas.texture.width * atlas.texture.height * 4 for atlas in self.atlas.atlases)
+    
+    def _get_location(self, path, force_type=None):
+        # The ID of a resource in the resource tree, how it's handled and where it is. Worked out once per path
+        info = self.path_info.get((path, force_type))
+        if info is None:
+            name = path.split("/")[-1].split(".")[0]
+            ext  = force_type or path.split(".")[-1].lower()
+            if force_type:
+                # Also used as a file name (see VideoPlayer)
+                location = f"Ekl{engine.VER}{path}::forced::{ext}".replace('/','.').replace(':',',')
+            else:
+                location = path
+            info = self.path_info[(path, force_type)] = (location, ext, name, self._resolve_path(path))
+        return info
+    
+    def _resolve_path(self, path):
+        if path.startswith("root://"):
+            return path[len("root://"):]
+        elif path.startswith("user://"):
+            return f"{self.save.save_dir}/{path[len('user://'):]}"
+        elif path.startswith("res://"):
+            return self.game_data.get("directory") + "/" + path[len("res://"):]
+        return path
+    
+    def _read(self, path, actual_path, ext, name, use_archive=True):
+        if use_archive and self.archive and path in self.archive:
+            return self._make_resource(path, ext, name, self._decode(path, actual_path, ext))
+        if IS_EXECUTABLE:
+            if ext in ("png","jpg","jpeg","webp","bmp"):
+                asset    = pg.resource.image(actual_path)
+                assetres = Image({
+                    "prop":   {},
+                    "data":   {
+                        "object": asset,
+                        "path":   path
+                    },
+                    "meta":   {
+                        "kind": "Resource",
+                        "name": "Image"
+                    },
+                    "script": None
+                })
+            elif ext in ("ttf","otf"):
+                asset    = pg.resource.add_font(actual_path)
+                assetres = Media({
+                    "prop":   {},
+                    "data":   {
+                        "object": asset,
+                        "path":   path
+                    },
+                    "meta":   {
+                        "kind": "Resource",
+                        "name": "Media"
+                    },
+                    "script": None
+                })
+            elif ext in ("mp3","ogg","wav","mp4","webm","flac","avi","mpeg"):
+                asset    = Sound(f"{sys._MEIPASS}/{actual_path}")
+                assetres = Media({
+                    "prop":   {},
+                    "data":   {
+                        "object": asset,
+                        "path":   path
+                    },
+                    "meta":   {
+                        "kind": "Resource",
+                        "name": "Media"
+                    },
+                    "script": None
+                })
+            elif ext in ("res", "import"):
+                asset    = pg.resource.file(actual_path, "rb")
+                assetres = self.load_from_resf(asset)
+            elif ext in ("ekl", "py", "scn"):
+                asset    = pg.resource.file(actual_path).read()
+                assetres = Script({
+                    "prop":   {},
+                    "data":   {
+                        "object": asset,
+                        "lang":   "python/ekl",
+                        "path":   path
+                    },
+                    "meta":   {
+                        "kind": "Resource",
+                        "name": "Script/PlainText"
+                    },
+                    "script": None
+                })
+            elif ext == "bin":
+                asset    = pg.resource.file(actual_path, "rb").read()
+                assetres = asset
+            elif ext == "std":
+                asset    = pg.resource.file(actual_path, "rb")
+                assetres = asset
+            else:
+                asset    = pg.resource.file(actual_path, "r").read()
+                assetres = asset
+        else:
+            if ext in ("png","jpg","jpeg","webp","bmp","dds"):
+                asset    = pg.image.load(actual_path)
+                if ext != "dds":
+                    asset = self._pack(asset, path)
+                assetres = Image({
+                    "prop":   {},
+                    "data":   {
+                        "object": asset,
+                        "path":   path
+                    },
+                    "meta":   {
+                        "kind": "Resource",
+                        "name": "Image"
+                    },
+                    "script": None
+                })
+            elif ext in ("ttf","otf"):
+                asset    = pg.font.load(name)
+                assetres = Media({
+                    "prop":   {},
+                    "data":   {
+                        "object": asset,
+                        "path":   path
+                    },
+                    "meta":   {
+                        "kind": "Resource",
+                        "name": "Media"
+                    },
+                    "script": None
+                })
+            elif ext in ("mp3","ogg","wav","mp4","webm","avi","mpeg"):
+                asset    = Sound(actual_path)
+                assetres = Media({
+                    "prop":   {},
+                    "data":   {
+                        "object": asset,
+                        "path":   path
+                    },
+                    "meta":   {
+                        "kind": "Resource",
+                        "name": "Media"
+                    },
+                    "script": None
+                })
+            elif ext in ("res", "import"):
+                asset    = open(actual_path,"rb")
+                assetres = self.load_from_resf(asset)
+            elif ext in ("ekl", "py", "scn"):
+                asset    = open(actual_path).read()
+                assetres = Script({
+                    "prop":   {},
+                    "data":   {
+                        "object": asset,
+                        "lang":   "python/ekl",
+                        "path":   path
+                    },
+                    "meta":   {
+                        "kind": "Resource",
+                        "name": "Script/PlainText"
+                    },
+                    "script": None
+                })
+            elif ext == "bin":
+                asset    = open(actual_path, "rb").read()
+                assetres = asset
+            elif ext == "std":
+                asset    = open(actual_path, "rb")
+                assetres = asset
+            else:
+                asset    = open(actual_path).read()
+                assetres = asset
+        return assetres
+
+    def _get_faulty(self, path, ext):
+        # What you get when a file couldn't be loaded
+        if ext == "bin":
+            assetres = b"Faulty"
+        elif ext in ("png","jpg","jpeg","webp","bmp","dds"):
+            assetres = self.resource_tree["mem://unknown"]
+        elif ext in ("res", "import"):
+            asset    = io.BytesIO(b"RES")
+            assetres = self.load_from_resf(asset)
+        elif ext in ("ekl", "py", "scn"):
+            asset    = "# Faulty"
+            assetres = Script({
+                "prop":   {},
+                "data":   {
+                    "object": asset,
+                    "lang":   "python/ekl",
+                    "path":   path
+                },
+                "meta":   {
+                    "kind": "Resource",
+                    "name": "Script/PlainText"
+                },
+                "script": None
+            })
+        else:
+            assetres = "Faulty"
+        return assetres
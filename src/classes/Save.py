@@ -1,52 +1,155 @@
 ## Import all the libraries
 import json, os
+from concurrent.futures import ThreadPoolExecutor
 from functools import reduce
 import operator
 import classes.Singleton as engine
 
+MISSING = object() # Marks a key path that isn't in the save
+
 ## Savefile class
 class Savefile:
+    """
+    The save file. (`save.json` in the save directory)
+
+    `set()` only marks the save as dirty, and `update()` (once per frame) writes it if it is. So any amount of
+    changes in a frame is a single write. The data is snapshotted on the main thread and written on a background
+    thread, to a temporary file that replaces `save.json` once it's on the disk, so a crash can't leave half a save.
+    `on_saved` is sent from the main thread when the write is done.
+
+    Key paths (`display/showfps`) are split once, and the values read with `get()` are cached until the next `set()`.
+    Change values with `set()`, not in place, so the cache and the subscribers see it. `subscribe()` gets a callback
+    called with the value of a key path now and every time it (or a path in it or above it) is set.
+    """
+
     def __init__(self):
         self.data      = engine.Data
         self.save_dir  = f"{os.path.expanduser('~')}/{self.data.game_name}" # Save file directory
         self.savefpath = f"{self.save_dir}/save.json" # Save file path
         self.base_save = f"{self.data.data_directory}/base_save.json"       # Empty save file path
         self.savefile  = {}
+        self.dirty     = False
+        self.pending   = None                                               # Write in progress
+        self.executor  = ThreadPoolExecutor(max_workers=1, thread_name_prefix="EklSave")
+        self.paths     = {}                                                 # Key path -> tuple of keys
+        self.values    = {}                                                 # Key path -> value
+        self.listeners = {}                                                 # Key path -> list of callbacks
         self.load_data()
-    
+
     def load_data(self):
         try:
             self.savefile = json.loads(open(self.savefpath).read())
         except:
             self.savefile = json.loads(open(self.base_save).read())
-    
-    def save_data(self):
+        self.values.clear()
+
+    def _write(self, text):
         try:
             os.makedirs(self.save_dir, exist_ok=True)
-            with open(self.savefpath, "w") as f:
-                f.write(json.dumps(self.savefile))
-            engine.event.on_saved(True)
+            tmp_path = f"{self.savefpath}.tmp"
+            with open(tmp_path, "w") as f:
+                f.write(text)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.savefpath)
+            return True
         except:
+            return False
+
+    def _finish(self):
+        # Send the result of the last write
+        successfully = self.pending.result()
+        self.pending = None
+        engine.event.on_saved(successfully)
+
+    def save_data(self, wait=False):
+        """Write the save in the background. With `wait`, block until it's on the disk. (Quitting, reloading)"""
+        if self.pending:
+            if not wait and not self.pending.done():
+                self.dirty = True # Written once the current write is done
+                return
+            self._finish()
+        self.dirty = False
+        try:
+            text = json.dumps(self.savefile)
+        except:
+            # Retrying won't help until a `set()` changes the data, so it's only reported once
             engine.event.on_saved(False)
-    
+            return
+        self.pending = self.executor.submit(self._write, text)
+        if wait:
+            self._finish()
+
+    def update(self):
+        """Send the result of a finished write, and write the save if it changed. Called once per frame."""
+        if self.pending and self.pending.done():
+            self._finish()
+        if self.dirty and not self.pending:
+            self.save_data()
+
+    def close(self):
+        """Write the save and stop the save thread."""
+        self.save_data(wait=True)
+        self.executor.shutdown()
+
+    def _get_path(self, key):
+        path = self.paths.get(key)
+        if path is None:
+            path = self.paths[key] = tuple(key.split('/'))
+        return path
+
+    def _lookup(self, key):
+        # The value at a key path, or MISSING
+        try:
+            value = self.values[key]
+        except KeyError:
+            try:
+                value = reduce(operator.getitem, self._get_path(key), self.savefile)
+            except:
+                return MISSING
+            self.values[key] = value
+        return value
+
     def get(self, key, fallback=0):
         # Keypath (key/is/here) -> value (self.savefile['key']['is']['here'])
-        try:
-            return reduce(operator.getitem, key.split('/'), self.savefile)
-        except:
+        value = self._lookup(key)
+        if value is MISSING:
             self.set(key, fallback)
             return fallback
+        return value
 
     def set(self, key, value):
         # That too, but for set.
         # Return 0 if we chillin, and 1 if this code bit my ass
         try:
-            keys = key.split('/')
+            keys = self._get_path(key)
             d = self.savefile
             for k in keys[:-1]:
                 d = d.setdefault(k, {})
             d[keys[-1]] = value
-
-            return 0
+            self.dirty = True
         except:
-            return 1
\ No newline at end of file
+            return 1
+
+        self.values.clear()
+        self._notify(key)
+        return 0
+
+    def subscribe(self, key, callback, fallback=0):
+        """Call `callback(value)` with the value of a key path now, and every time it changes."""
+        self.listeners.setdefault(key, []).append(callback)
+        callback(self.get(key, fallback))
+
+    def unsubscribe(self, key, callback):
+        callbacks = self.listeners.get(key, [])
+        if callback in callbacks:
+            callbacks.remove(callback)
+
+    def _notify(self, key):
+        # Setting a path also changes the paths in it and the ones above it
+        for path, callbacks in list(self.listeners.items()):
+            if callbacks and (path == key or path.startswith(key+"/") or key.startswith(path+"/")):
+                value = self._lookup(path)
+                if value is not MISSING:
+                    for callback in list(callbacks):
+                        callback(value)
@@ -1,8 +1,8 @@
 ## Import all the libraries
 import pyglet as pg
-import json, time, types, tkinter as tk
+import json, time, types, fnmatch, copy, tkinter as tk
 from tkinter.messagebox import *
-from classes import Event, UI, Resources
+from classes import Event, UI, Resources, Physics, Manifest
 from classes.Object import Object
 from pyglet import gl
 from anytree import NodeMixin
@@ -36,43 +36,68 @@ from classes.node.twod.physicsbody2d     import *
 from classes.node.twod.collisionbox2d    import *
 from classes.node.twod.parallax2d        import *
 
+# Node classes whose `update` does more than run the script (filled as classes are seen)
+engine_updated = {}
+
+def _has_engine_work(cls):
+    work = engine_updated.get(cls)
+    if work is None:
+        work = engine_updated[cls] = cls.update is not Node.update
+    return work
+
 ## Scene class
 class Scene(Object):
     def __init__(self, file_path):
         self.file_path        = file_path
         self.nodes            = {}
+        self.node_index       = {} # "path/to/node" -> [node entries], siblings can share a name, the first one is found
+        self.node_children    = {} # "path/to" -> {node id: node entry}, "" has the root nodes
+        self.groups           = {} # group name -> {node id: node}
+        self.next_id          = 0
+        self.roots            = {} # Nodes without a parent, where the update traversal starts (dict used as an ordered set)
+        self.free_queue       = {} # Nodes freed this frame, removed from the scene by `flush_free_queue()`
+        self.paused           = False
         self.cam_pos          = [0, 0]
         self.nodes_collision  = {}
+        self.bodies           = {} # Area2Ds that ran in the last update, stepped by the physics stepper (dict used as an ordered set)
+        self.collision_grid   = Physics.SpatialHash(engine.cvars.get("phys_cellsize", 128))
+        self.collision_bounds = Physics.ColliderBounds()
         self.properties       = {}
         self.screen           = engine.interface
         self.resourceman      = engine.resource_loader
     
     def empty(self):
         self.nodes_collision = {}
+        self.bodies          = {}
+        self.collision_grid.clear()
+        self.collision_bounds.clear()
         self.cam_pos         = [0, 0]
         for i in self.nodes:
-            self.nodes[i]["object"].free()
+            node      = self.nodes[i]["object"]
+            node.pool = None # Free pooled nodes too, instead of parking them
+            node.free()
         self.nodes           = {}
+        self.node_index      = {}
+        self.node_children   = {}
+        self.groups          = {}
+        self.roots           = {}
+        self.free_queue      = {}
     
     def add_node(self, node_data={}):
-        id = len(self.nodes)
+        id            = self.next_id
+        self.next_id += 1
 
         # Full path including this node
-        full_path   = f"{node_data['path']}/{node_data['name']}".strip("/")
-
-        directories  = full_path.split("/")[:-1]  # Only parents, exclude self
+        parent_path  = node_data["path"].strip("/")
+        full_path    = f"{parent_path}/{node_data['name']}".strip("/")
         parent       = None
-        current_path = ""
 
-        for directory in directories:
-            if len(current_path) == 0:
-                continue
-            existing = self.get_node_from_path(current_path.lstrip("/"), directory)
-            current_path += f"/{directory}"
+        if parent_path:
+            existing = self._get_entry(parent_path)
             if not existing:
                 raise Exception("The parent of the node you are creating does not exist.")
             else:
-                parent = existing
+                parent = existing["object"]
 
         # Construct node data
         node_obj_data = {
@@ -90,44 +115,314 @@ class Scene(Object):
         object             = classobj.__new__(classobj)
         object.__init__(node_obj_data, parent)
 
-        # Store in flat dictionary
-        self.nodes[id] = {
+        # Store in flat dictionary, and index it by its path
+        entry = {
             "class": node_data["type"],
             "path": node_data["path"],
             "object": object,
             "name": node_data["name"],
-            "base_data": node_data
+            "base_data": node_data,
+            "full_path": full_path,
+            "id": id
         }
+        self.nodes[id] = entry
+        self.node_index.setdefault(full_path, []).append(entry)
+        self.node_children.setdefault(parent_path, {})[id] = entry
+        if parent is None:
+            self.roots[object] = None
+        object.scene_id    = id
+        for group in node_data.get("groups", []):
+            self.add_to_group(object, group)
 
-        return self.nodes[id]["object"]
+        return object
 
     def load(self):
         self.empty()
-        scene_obj  = json.loads(self.resourceman.load(self.file_path).get())
+        scene_text = self.resourceman.load(self.file_path).get()
+        scene_obj  = json.loads(scene_text)
+        if engine.cvars.get("scn_prefetch", True):
+            # Load everything the scene uses in parallel first, instead of one file per node
+            self.resourceman.preload(Manifest.get_manifest(self.resourceman, self.file_path, scene_text, scene_obj)).wait()
         self.properties = scene_obj["Properties"]
         for node in scene_obj["Nodes"]:
             node_data = scene_obj["Nodes"][node]
             self.add_node(node_data)
 
     def update(self, delta):
+        """
+        Update the node tree, parents before their children.
+        Branches that are disabled, or invisible with `when_visible`, aren't visited at all. Paused branches (and
+        pausable ones while the scene is paused) only get redrawn, so they stay on screen without running.
+        Nodes with nothing to do this frame (no `_process`, no deferred calls, no engine work) are skipped.
+        """
         try:
-            for nodeID in self.nodes:
-                try:
-                    node = self.nodes[nodeID]["object"]
-                except:
-                    print("Node may have been removed without notice.. Skipping")
-                    continue
+            stack  = [(node, "pausable") for node in reversed(self.roots)]
+            bodies = {}
+            while stack:
+                node, parent_mode = stack.pop()
                 if node.stop_running:
-                    node._free()
                     continue
-                node.update(delta)
+                mode              = self._get_mode(node, parent_mode)
+                if not self._can_process(node, mode):
+                    continue
+                if mode == "paused":
+                    node._redraw()
+                else:
+                    if node.in_physics:
+                        bodies[node] = None
+                    if node.has_process or node.call_deferr_list or _has_engine_work(type(node)):
+                        node.update(delta)
+                children = node.children
+                if children:
+                    stack.extend((child, mode) for child in reversed(children))
+            self.bodies = bodies
+            self.flush_free_queue()
         except Exception as error:
             print(f" Scene({self.file_path}) had an error updating; {error}")
             raise error
     
+    def queue_free(self, node):
+        self.free_queue[node] = None
+    
+    def flush_free_queue(self):
+        """Remove the nodes freed this frame from the scene. Called at the end of `update()`."""
+        while self.free_queue:
+            node = next(iter(self.free_queue))
+            del self.free_queue[node]
+            self._remove_node(node)
+    
+    def _remove_node(self, node):
+        entry = self.nodes.pop(getattr(node, "scene_id", None), None)
+        if entry:
+            full_path   = entry["full_path"]
+            parent_path = entry["path"].strip("/")
+            # Only this node, a sibling with the same name is found in its place
+            entries = self.node_index.get(full_path)
+            if entries:
+                entries.remove(entry)
+                if not entries:
+                    del self.node_index[full_path]
+            siblings = self.node_children.get(parent_path)
+            if siblings:
+                siblings.pop(entry["id"], None)
+        for group in node.runtime_data.get("groups", ()):
+            self.groups.get(group, {}).pop(node.get_instance_id(), None)
+        self.roots.pop(node, None)
+        node.parent = None
+        node._free()
+    
+    def _get_mode(self, node, parent_mode):
+        # The process mode a node runs with, inheriting it from its parent's
+        mode = node.properties.get("process_mode", "inherit")
+        if mode == "inherit" or (parent_mode == "paused" and mode != "disabled"):
+            mode = parent_mode
+        if mode == "pausable" and self.paused:
+            mode = "paused"
+        return mode
+    
+    def _can_process(self, node, mode):
+        if mode == "disabled":
+            if not node.runtime_data.get("branch_hidden"):
+                self._hide_branch(node)
+            return False
+        if mode == "when_visible" and not node.properties.get("visible", True):
+            # Its `draw()` doesn't run anymore, so hide what it left on screen
+            if not node.runtime_data.get("branch_hidden"):
+                self._hide_branch(node)
+            return False
+        if node.runtime_data.get("branch_hidden"):
+            self._show_branch(node, mode)
+        return True
+    
+    def _hide_branch(self, node):
+        # Done once when a branch gets disabled (or invisible with `when_visible`), it's skipped entirely after that
+        node.runtime_data["branch_hidden"] = True
+        node._hide()
+        for child in node.descendants:
+            child._hide()
+    
+    def _show_branch(self, node, mode):
+        # Done once when a hidden branch runs again, skipping the parts `_can_process()` would hide again
+        # (Disabled on their own, or invisible with `when_visible`)
+        node.runtime_data["branch_hidden"] = False
+        node._show()
+        stack = [(child, mode) for child in node.children]
+        while stack:
+            child, parent_mode = stack.pop()
+            mode               = self._get_mode(child, parent_mode)
+            if mode == "disabled" or (mode == "when_visible" and not child.properties.get("visible", True)):
+                continue
+            child._show()
+            stack.extend((grandchild, mode) for grandchild in child.children)
+    
+    def set_paused(self, paused):
+        """Pause or resume every node that is `pausable`. (The default for root nodes)"""
+        self.paused = paused
+    
+    def get_overlapping_pairs(self):
+        """Get every pair of Area2Ds that overlap in the scene, checked in one batch."""
+        return self.collision_bounds.pairs(self.collision_grid)
+
     ## Get nodes
+    def _get_entry(self, full_path):
+        # The first node added with a path that is still in the scene, or None
+        entries = self.node_index.get(full_path)
+        if entries:
+            return entries[0]
+    
     def get_node_from_path(self, path, name):
-        for i in self.nodes:
-            if self.nodes[i]["path"] == path:
-                if self.nodes[i]["name"] == name:
-                    return self.nodes[i]["object"]
\ No newline at end of file
+        entry = self._get_entry(f"{path.strip('/')}/{name}".strip("/"))
+        if entry:
+            return entry["object"]
+    
+    def get_node(self, full_path):
+        """Get a node from its full path. (`"Back/Panel"`) If siblings share a name, the first one added is found."""
+        entry = self._get_entry(full_path.strip("/"))
+        if entry:
+            return entry["object"]
+    
+    def get_children(self, path=""):
+        """Get the direct children of the node at `path`. (The root nodes if empty)"""
+        return [entry["object"] for entry in self.node_children.get(path.strip("/"), {}).values()]
+    
+    def find_children(self, pattern, path="", recursive=True):
+        """Get the nodes under `path` whose name matches a shell-style pattern. (`"Text*"`)"""
+        found = []
+        stack = [path.strip("/")]
+        seen  = set(stack) # Siblings with the same name share their children
+        while stack:
+            children = self.node_children.get(stack.pop(), {})
+            for entry in children.values():
+                if fnmatch.fnmatchcase(entry["name"], pattern):
+                    found.append(entry["object"])
+                if recursive and entry["full_path"] not in seen:
+                    seen.add(entry["full_path"])
+                    stack.append(entry["full_path"])
+        return found
+    
+    ## Groups
+    def add_to_group(self, node, group):
+        self.groups.setdefault(group, {})[node.get_instance_id()] = node
+        node.runtime_data.setdefault("groups", set()).add(group)
+    
+    def remove_from_group(self, node, group):
+        self.groups.get(group, {}).pop(node.get_instance_id(), None)
+        node.runtime_data.get("groups", set()).discard(group)
+    
+    def get_nodes_in_group(self, group):
+        return list(self.groups.get(group, {}).values())
+
+## Packed scene class
+class PackedScene:
+    """
+    A copy of a node and its children, that can be instanced into a scene as many times as needed.
+    The node is copied as it is when packed, without its `process_mode`. (So a disabled template node can be packed)
+    """
+
+    def __init__(self, scene, full_path):
+        root = scene._get_entry(full_path.strip("/"))
+        if not root:
+            raise Exception(f"Cannot pack \"{full_path}\", the node does not exist.")
+        self.scene     = scene
+        self.root_path = root["full_path"]
+        self.name      = root["name"]
+        self.nodes     = [] # (path relative to the root, node data), parents first
+        for entry in scene.nodes.values():
+            path = entry["full_path"]
+            if entry is root or path.startswith(self.root_path + "/"):
+                self.nodes.append((path[len(self.root_path):].strip("/"), copy.deepcopy(entry["base_data"])))
+        self.nodes[0][1]["properties"].pop("process_mode", None)
+
+    def instance(self, parent_path="", name=None):
+        """Add a copy of the packed nodes under `parent_path`, and return the root node."""
+        name      = name or self.name
+        parent    = parent_path.strip("/")
+        root_path = f"{parent}/{name}".strip("/")
+        created   = []
+        for rel_path, node_data in self.nodes:
+            node_data = copy.deepcopy(node_data)
+            if rel_path:
+                node_data["path"] = f"{root_path}/{rel_path.rsplit('/', 1)[0]}" if "/" in rel_path else root_path
+            else:
+                node_data["path"] = parent
+                node_data["name"] = name
+            created.append(self.scene.add_node(node_data))
+        root                            = created[0]
+        root.runtime_data["pack_nodes"] = created # Same order as self.nodes, for `reset()`
+        return root
+
+    def reset(self, root):
+        """Put the properties of an instance back to the packed ones, in place."""
+        for node, (rel_path, node_data) in zip(root.runtime_data["pack_nodes"], self.nodes):
+            if node.runtime_data.get("queued_free"):
+                continue # Freed on its own, it's not coming back
+            _reset_in_place(node.properties, node_data["properties"])
+            if hasattr(node, "reset_interpolation"):
+                node.reset_interpolation() # Don't slide back to the packed position
+            for key in node_data["properties"]:
+                if key in node.namespace:
+                    node.namespace[key] = node.properties[key] # Scripts see the properties as globals
+
+## Node pool class
+class NodePool:
+    """
+    Pre-instanced copies of a PackedScene, for nodes that are spawned often. (Bullets, particles..)
+
+    `acquire()` hands out a parked copy after resetting its properties, without loading or running anything again.
+    Freeing a pooled node parks it back. (It's disabled, hidden and skipped by `Scene.update()`)
+    A script can have a `_pool_reset(self)` function to reset its own variables when it's handed out again.
+    If the pool runs out, it grows by one copy.
+    """
+
+    def __init__(self, packed, size=16, parent_path=""):
+        self.packed      = packed
+        self.parent_path = parent_path
+        self.free        = []
+        self.used        = {}
+        self.created     = 0
+        for i in range(size):
+            self.free.append(self._create())
+
+    def _create(self):
+        root              = self.packed.instance(self.parent_path, f"{self.packed.name}@{self.created}")
+        self.created     += 1
+        root.pool         = self
+        self._park(root)
+        return root
+
+    def _park(self, root):
+        root.properties["process_mode"] = "disabled"
+        root.call_deferr_list.clear()
+        self.packed.scene._hide_branch(root)
+
+    def acquire(self):
+        root = self.free.pop() if self.free else self._create()
+        self.packed.reset(root) # This also drops the "disabled" process mode
+        self.used[root] = None
+        for node in root.runtime_data["pack_nodes"]:
+            if node.runtime_data.get("queued_free"):
+                continue
+            node.call_deferr_list.clear()
+            node._pool_reset()
+            node.call("_pool_reset")
+        return root
+
+    def release(self, root):
+        if root in self.used:
+            del self.used[root]
+            self._park(root)
+            self.free.append(root)
+
+## Other
+def _reset_in_place(target, template):
+    # Keep the same dicts and lists, so references to them (like in script namespaces) stay valid
+    for key in [key for key in target if key not in template]:
+        del target[key]
+    for key, value in template.items():
+        current = target.get(key)
+        if isinstance(value, dict) and isinstance(current, dict):
+            _reset_in_place(current, value)
+        elif isinstance(value, list) and isinstance(current, list) and not any(isinstance(item, (dict, list)) for item in value):
+            current[:] = value
+        else:
+            target[key] = copy.deepcopy(value)
@@ -35,6 +35,6 @@ class TkWindow(Node):
         self.tk_self = tk.Tk()
         self.tk_self.geometry(self.properties["dimension"])
         self.tk_self.title(self.properties["caption"])
-        icon_image  = Image.open(io.BytesIO(engine.resource_loader.load(self.properties["icon"]), force_type = "bin"))
+        icon_image  = Image.open(io.BytesIO(engine.resource_loader.load(self.properties["icon"], force_type = "bin")))
         photo_image = ImageTk.PhotoImage(icon_image)
         self.tk_self.wm_iconphoto(True, photo_image)
\ No newline at end of file
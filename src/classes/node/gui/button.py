@@ -4,6 +4,7 @@ from classes.node.gui.canvasitem import CanvasItem
 ## Import engine singleton and others
 import pyglet as pg
 import classes.Singleton as engine
+from classes.UI import NineSlice, TextHandle
 
 ## Node
 class Button(CanvasItem):
@@ -30,10 +31,12 @@ class Button(CanvasItem):
     }
 
     def __init__(self, data=node_base_data, parent=None):
+        self.thmbatch            = pg.graphics.Batch()
+        self.nine_slice          = NineSlice()   # Made before the script runs, like Label's text handle
+        self.text_handle         = TextHandle()
         super().__init__(data,parent)
         self.clicked             = False
         self.image               = 0
-        self.thmbatch            = pg.graphics.Batch()
     
     def update(self, delta):
         super().update(delta)
@@ -46,6 +49,9 @@ class Button(CanvasItem):
     def draw(self, typ="button"):
         if self.properties["visible"]:
             self.w,self.h = self._draw_onto_screen(typ)
+        else:
+            self.nine_slice.delete()
+            self.text_handle.hide()
     
     def _draw_onto_screen(self, typ="button"):
         lbl = self.screen.render(
@@ -55,7 +61,8 @@ class Button(CanvasItem):
                 self.runtime_data["rendererpos"][1]
             ],
             anchor = self.properties["transform"]["anchor"],
-            color  = engine.thm.get_thing(typ)["fontcol"]
+            color  = engine.thm.get_thing(typ)["fontcol"],
+            handle = self.text_handle
         )
 
         # Check if size property is smaller than it should be
@@ -66,5 +73,15 @@ class Button(CanvasItem):
             sz[1] = lbl[1]+7.5
 
         # Draw the themed button        
-        thmobj = engine.thm.draw_marginable_thing(typ, self.runtime_data["rendererpos"], sz, self.window_id, self.properties["transform"]["anchor"], self.properties["transform"]["layer"])
-        return thmobj
\ No newline at end of file
+        thmobj = engine.thm.draw_marginable_thing(typ, self.runtime_data["rendererpos"], sz, self.window_id, self.properties["transform"]["anchor"], self.properties["transform"]["layer"], handle=self.nine_slice)
+        return thmobj
+    
+    def _hide(self):
+        self.nine_slice.delete()
+        self.text_handle.hide()
+        super()._hide()
+    
+    def free(self):
+        self.nine_slice.delete()
+        self.text_handle.delete()
+        super().free()
\ No newline at end of file
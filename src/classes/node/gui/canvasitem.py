@@ -3,8 +3,10 @@ from classes.node.node import Node
 
 ## Import engine singleton and others
 import pyglet as pg
+import math
 import classes.Singleton as engine
 from classes.Constants import *
+from classes.UI import Retained
 
 ## Node
 class CanvasItem(Node):
@@ -15,7 +17,14 @@ class CanvasItem(Node):
     This has no effect by Cameras, which makes it good for rendering UI elements. Which is its purpose.
     For Nodes in a 2D world, use Node2D.
 
-    This has relativity only on the position.
+    The transform is relative to the parent: children inherit its position, scale and rotation.
+    The world transform (`world_pos`, `world_scale`, `world_rot`) is cached, and only recomputed once per frame
+    when the transform of this node or one of its parents changed. Don't modify the cached lists in place.
+    If you change a transform and need the new world transform in the same frame, call `invalidate_transform()`.
+
+    By default the image is drawn in retained mode (see the `ui_retained` CVar, or the `retained` property to
+    override it per node). The sprite stays on screen and is only updated when the transform, image, opacity or
+    visibility changes. Call `mark_dirty()` to force an update.
     """
     node_base_data = {
         "prop":   {
@@ -39,21 +48,82 @@ class CanvasItem(Node):
     }
 
     def __init__(self, data=node_base_data, parent=None):
-        super().__init__(data,parent)
+        # Set before the script is loaded, so its `_ready()` can use them
+        transform                        = data["prop"]["transform"]
         self.clicked                     = False
         self.holding                     = False
         self.w,self.h                    = 0, 0
-        self.anchor                      = self.properties["transform"]["anchor"]
+        self.anchor                      = transform["anchor"]
+        self.image                       = None
+        self.retained                    = None
+        if data["prop"].get("retained", engine.cvars.get("ui_retained", True)):
+            self.retained                = Retained()
+
+        ## Cached world transform
+        self.world_pos                   = transform["pos"][:]
+        self.world_scale                 = transform.get("scale", [1, 1])[:]
+        self.world_rot                   = transform.get("rot", 0)
+        self.parent_pos                  = [0, 0]
+        self.world_version               = 0     # Goes up every time the world transform changes
+        self._local_transform            = None
+        self._parent_version             = None
+        self._transform_tick             = -1
+        super().__init__(data,parent)
         self.runtime_data["rendererpos"] = self.properties["transform"]["pos"][:]
         self.runtime_data["relativepos"] = self.properties["transform"]["pos"][:]
 
+    def _get_local_pos(self):
+        # The position this node is rendered at, relative to its parent
+        return self.properties["transform"]["pos"]
+
+    def _get_local_transform(self):
+        transform = self.properties["transform"]
+        pos       = self._get_local_pos()
+        scale     = transform.get("scale", (1, 1))
+        return pos[0], pos[1], scale[0], scale[1], transform.get("rot", 0)
+
+    def update_transform(self):
+        """Recompute the world transform if needed, and return its version. Parents are updated first."""
+        if self._transform_tick == engine.ticks:
+            return self.world_version
+        self._transform_tick = engine.ticks
+
+        parent         = self.parent if isinstance(self.parent, CanvasItem) else None
+        parent_version = parent.update_transform() if parent else -1
+        local          = self._get_local_transform()
+        if local == self._local_transform and parent_version == self._parent_version:
+            return self.world_version
+        self._local_transform = local
+        self._parent_version  = parent_version
+
+        x, y, sx, sy, rot = local
+        if parent:
+            psx, psy   = parent.world_scale
+            prot       = parent.world_rot
+            x, y       = x * psx, y * psy
+            if prot:
+                rad    = math.radians(prot)
+                cs, sn = math.cos(rad), math.sin(rad)
+                x, y   = x * cs - y * sn, x * sn + y * cs
+            x, y       = x + parent.world_pos[0], y + parent.world_pos[1]
+            sx, sy     = sx * psx, sy * psy
+            rot       += prot
+        self.world_pos     = [x, y]
+        self.world_scale   = [sx, sy]
+        self.world_rot     = rot
+        self.parent_pos    = parent.world_pos if parent else [0, 0]
+        self.world_version += 1
+        return self.world_version
+    
+    def invalidate_transform(self):
+        self._transform_tick = -1
+        for child in self.children:
+            if isinstance(child, CanvasItem):
+                child.invalidate_transform()
+
     def get_relative_pos(self):
-        my_pos     = self.properties["transform"]["pos"]
-        parent_pos = [0, 0]
-        if self.parent and hasattr(self.parent, "get_relative_pos"):
-            parent_pos = self.parent.get_relative_pos()[0]
-            return [my_pos[0] + parent_pos[0], my_pos[1] + parent_pos[1]], parent_pos
-        return my_pos[:], parent_pos
+        self.update_transform()
+        return self.world_pos, self.parent_pos
     
     def get_relative_anchor(self):
         if self.parent and hasattr(self.parent, "anchor"):
@@ -64,6 +134,24 @@ class CanvasItem(Node):
         if self.image and self.properties["visible"]:
             self.w,self.h         = self.image.width,self.image.height
             self._draw_onto_screen(self.image)
+        elif self.retained:
+            self.retained.hide()
+    
+    def _redraw(self):
+        # Text and immediate mode blits only stay on screen while they're drawn every frame
+        self.draw()
+    
+    def _hide(self):
+        if self.retained:
+            self.retained.hide()
+    
+    def mark_dirty(self):
+        if self.retained:
+            self.retained.mark_dirty()
+    
+    def _pool_reset(self):
+        self.invalidate_transform()
+        self.mark_dirty()
     
     def get_if_mouse_hovering(self):
         mpos = engine.mpos
@@ -76,13 +164,25 @@ class CanvasItem(Node):
         )
     
     def _draw_onto_screen(self, img):
+        if self.retained:
+            return self.screen.retain(
+                self.retained,
+                img,
+                self.runtime_data["rendererpos"],
+                anchor  = self.properties["transform"]["anchor"],
+                scale   = self.world_scale,
+                layer   = self.properties["transform"]["layer"],
+                rot     = self.world_rot,
+                opacity = self.properties["transform"]["alpha"],
+                scroll  = self.properties["transform"]["scroll"]
+            )
         return self.screen.blit(
             img,                                   
             self.runtime_data["rendererpos"],             
             anchor  = self.properties["transform"]["anchor"],
-            scale   = self.properties["transform"]["scale"],
+            scale   = self.world_scale,
             layer   = self.properties["transform"]["layer"],
-            rot     = self.properties["transform"]["rot"],
+            rot     = self.world_rot,
             opacity = self.properties["transform"]["alpha"],
             scroll  = self.properties["transform"]["scroll"]
         )
@@ -106,4 +206,9 @@ class CanvasItem(Node):
         self.runtime_data["relativepos"] = rel_pos
         self.runtime_data["rendererpos"] = rel_pos
         
-        super().update(delta)
\ No newline at end of file
+        super().update(delta)
+    
+    def free(self):
+        if self.retained:
+            self.retained.delete()
+        super().free()
\ No newline at end of file
@@ -4,14 +4,14 @@ from classes.node.gui.canvasitem import CanvasItem
 ## Import engine singleton and others
 import pyglet as pg
 import classes.Singleton as engine
-from classes import Resources
+from classes.UI import ColorQuad
 
 ## Node
 class ColorRect(CanvasItem):
     """
     ## A Canvas Node to render a colored Rectangle.
      
-    Self-explanatory.
+    Self-explanatory. It's drawn as a colored quad, so changing its color, size or alpha is free.
     """
      
     node_base_data = {
@@ -38,30 +38,40 @@ class ColorRect(CanvasItem):
     }
 
     def __init__(self, data=node_base_data, parent=None):
+        self.quad     = ColorQuad() # Drawn as a colored rectangle, no texture is made
         super().__init__(data,parent)
-        r, g, b = self.properties["color"]
-        # RGB for each pixel, repeated for all pixels
-        raw_data = bytes([r, g, b] * self.properties["transform"]["size"][0] * self.properties["transform"]["size"][1])
-        self.image = Resources.Image(
-            {
-                "prop":   {},
-                "data":   {
-                    "object": pg.image.ImageData(
-                        self.properties["transform"]["size"][0],
-                        self.properties["transform"]["size"][1],
-                        'RGB',
-                        raw_data
-                    ),
-                    "path":   f"{r}{g}{b}{self.properties["transform"]["size"]}.mm"
-                },
-                "meta":   {
-                    "kind": "Resource",
-                    "name": "Image"
-                },
-                "script": None
-            }
-        )
+        self.retained = None        # So the image sprite of CanvasItem isn't kept too
+
+    def draw(self):
+        if self.properties["visible"]:
+            self.w,self.h = self.properties["transform"]["size"]
+            self.screen.rect(
+                self.quad,
+                self.runtime_data["rendererpos"],
+                self.properties["transform"]["size"],
+                self.properties["color"],
+                anchor  = self.properties["transform"]["anchor"],
+                scale   = self.world_scale,
+                layer   = self.properties["transform"]["layer"],
+                rot     = self.world_rot,
+                opacity = self.properties["transform"]["alpha"],
+                blit_in = self.window_id
+            )
+        else:
+            self.quad.hide()
+    
+    def mark_dirty(self):
+        self.quad.mark_dirty()
+        super().mark_dirty()
+    
+    def _hide(self):
+        self.quad.hide()
+        super()._hide()
 
     def update(self, delta):
         super().update(delta)
-        self.draw()
\ No newline at end of file
+        self.draw()
+    
+    def free(self):
+        self.quad.delete()
+        super().free()
@@ -4,6 +4,7 @@ from classes.node.gui.canvasitem import CanvasItem
 ## Import engine singleton singleton and others
 import pyglet as pg
 import classes.Singleton as engine
+from classes.UI import TextHandle
 
 ## Node
 class Label(CanvasItem):
@@ -34,9 +35,15 @@ class Label(CanvasItem):
         "script": None
     }
 
+    def __init__(self, data=node_base_data, parent=None):
+        self.text_handle = TextHandle() # Keeps the text on the same label, see `Interface.render()`
+        super().__init__(data,parent)
+
     def draw(self):
         if self.properties["visible"]:
             self.w,self.h = self._draw_onto_screen(self.properties["text"])
+        else:
+            self.text_handle.hide()
         
     def _draw_onto_screen(self, text):
         return self.screen.render(
@@ -47,11 +54,20 @@ class Label(CanvasItem):
             layer   = self.properties["transform"]["layer"],
             blit_in = self.window_id,
             size    = self.properties["font_size"],
-            rot     = self.properties["transform"]["rot"],
+            rot     = self.world_rot,
             alpha   = self.properties["transform"]["alpha"],
-            color   = self.properties["color"]
+            color   = self.properties["color"],
+            handle  = self.text_handle
         )
     
     def update(self, delta):
         super().update(delta)
-        self.draw()
\ No newline at end of file
+        self.draw()
+    
+    def _hide(self):
+        self.text_handle.hide()
+        super()._hide()
+    
+    def free(self):
+        self.text_handle.delete()
+        super().free()
@@ -5,6 +5,7 @@ from classes.node.gui.canvasitem import CanvasItem
 import pyglet as pg
 import classes.Singleton as engine
 from classes import Resources
+from classes.UI import NineSlice, TextHandle
 
 class Progressbar(CanvasItem):
     """
@@ -41,17 +42,24 @@ class Progressbar(CanvasItem):
     }
 
     def __init__(self, data=node_base_data, parent=None):
+        self.barbatch    = pg.graphics.Batch()
+        self.barfbatch   = pg.graphics.Batch()
+        self.bar_slice   = NineSlice()         # Made before the script runs, like Label's text handle
+        self.fill_slice  = NineSlice(order=1)
+        self.text_handle = TextHandle()
         super().__init__(data,parent)
-        self.barbatch  = pg.graphics.Batch()
-        self.barfbatch = pg.graphics.Batch()
         
     def draw(self):
         if self.properties["visible"]:
             self.w,self.h=self._draw_onto_screen(self.properties["transform"]["size"][0] * (self.properties["value"] / abs(self.properties["maximum"] - self.properties["minimum"])))
+        else:
+            self.bar_slice.delete()
+            self.fill_slice.delete()
+            self.text_handle.hide()
     
     def _draw_onto_screen(self, width):
-        img_size = engine.thm.draw_marginable_thing("progressbar", self.runtime_data["rendererpos"], self.properties["transform"]["size"], self.window_id, self.properties["transform"]["anchor"], self.properties["transform"]["layer"], batch=self.barbatch)
-        pb       = engine.thm.draw_marginable_thing("progrfill", self.runtime_data["rendererpos"], [width, self.properties["transform"]["size"][1]], self.window_id, self.properties["transform"]["anchor"], self.properties["transform"]["layer"], batch=self.barfbatch)
+        img_size = engine.thm.draw_marginable_thing("progressbar", self.runtime_data["rendererpos"], self.properties["transform"]["size"], self.window_id, self.properties["transform"]["anchor"], self.properties["transform"]["layer"], handle=self.bar_slice)
+        pb       = engine.thm.draw_marginable_thing("progrfill", self.runtime_data["rendererpos"], [width, self.properties["transform"]["size"][1]], self.window_id, self.properties["transform"]["anchor"], self.properties["transform"]["layer"], handle=self.fill_slice)
 
         lw, lh, l = self.screen.render(
             f"{round(self.properties['value']/self.properties['maximum']*100)}%",
@@ -63,7 +71,8 @@ class Progressbar(CanvasItem):
             layer      = self.properties["transform"]["layer"],       
             color      = self.properties.get("txcolor", [255,255,255]),
             return_obj = True,
-            batchxt    = self.barfbatch
+            batchxt    = self.barfbatch,
+            handle     = self.text_handle
         )
         l.x = self.runtime_data["rendererpos"][0] + (self.properties["transform"]["size"][0]/2 - lw/2)
 
@@ -75,5 +84,17 @@ class Progressbar(CanvasItem):
             self.properties["value"] = self.properties["maximum"]
         self.draw()    
     
+    def _hide(self):
+        self.bar_slice.delete()
+        self.fill_slice.delete()
+        self.text_handle.hide()
+        super()._hide()
+    
+    def free(self):
+        self.bar_slice.delete()
+        self.fill_slice.delete()
+        self.text_handle.delete()
+        super().free()
+
     def _free(self):
         return super()._free()
\ No newline at end of file
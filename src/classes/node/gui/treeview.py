@@ -3,20 +3,40 @@ from classes.node.gui.canvasitem import CanvasItem
 
 ## Import engine singleton singleton and others
 import pyglet as pg
+import math
 import classes.Singleton as engine
+from classes.Constants import *
+from classes.UI import TextHandle
 
 ## Node
 class Treeview(CanvasItem):
+    """
+    ## A tree of text rows.
+
+    `children` is a nested dict (`{"name": {"child": {}}}`). The revealed part of the tree is flattened into a row
+    list, which is only rebuilt when the expansion changes or `children` is replaced. If you change the dict in place,
+    call `refresh()`.
+
+    Only the rows inside the viewport (`size`, in pixels) are rendered, so a frame costs the same for ten rows or
+    ten thousand. Scroll with the mouse wheel, `scroll_by()` or `scroll_to()`. Clicking a row toggles it and calls
+    `_row_clicked(path)` in the script, where the path is a tuple of names.
+    """
     # TODO: Make visually pleasing
     node_base_data = {
         "prop":   {
             "transform": {
+                "scale":  [1,1],
                 "pos":    [0,0],
                 "anchor": "top left",
-                "layer":  0
+                "layer":  0,
+                "alpha":  1,
+                "size":   [300, 400],
+                "scroll": [0, 0],
+                "rot":    0
             },
-            "visible":  True,
-            "children": {}
+            "visible":    True,
+            "row_height": 25,
+            "children":   {}
         },
         "data":   {},
         "meta":   {
@@ -28,32 +48,126 @@ class Treeview(CanvasItem):
 
     def __init__(self, data=node_base_data, parent=None):
         super().__init__(data,parent)
-        self.treechildren = {}
-        self.revealed     = []
-    
-    def _rlayer(self, data, pos=[0,0], layer = 0):
-        id        = 0
-        _pos      = pos.copy()
-        for i in data:
-            _have_kid = "v " if len(data[i]) else ""
+        self.treechildren = None
+        self.revealed     = set()  # Paths (tuples of names) of the expanded entries
+        self.rows         = []     # (depth, name, has children, path), in display order
+        self.rows_dirty   = True
+        self.scroll       = 0      # In pixels
+        self.slots        = []     # Text handles, one per row that fits in the viewport
+
+    ## Rows
+    def refresh(self):
+        """Rebuild the rows on the next frame."""
+        self.rows_dirty = True
+
+    def expand(self, path):
+        self.revealed.add(tuple(path))
+        self.rows_dirty = True
+
+    def collapse(self, path):
+        self.revealed.discard(tuple(path))
+        self.rows_dirty = True
+
+    def toggle(self, path):
+        if tuple(path) in self.revealed:
+            self.collapse(path)
+        else:
+            self.expand(path)
+
+    def _build_rows(self):
+        rows  = []
+        stack = [(0, name, kids, (name,)) for name, kids in reversed(list(self.treechildren.items()))]
+        while stack:
+            depth, name, kids, path = stack.pop()
+            rows.append((depth, name, bool(kids), path))
+            if kids and path in self.revealed:
+                stack.extend((depth+1, kid, grandkids, path+(kid,)) for kid, grandkids in reversed(list(kids.items())))
+        self.rows       = rows
+        self.rows_dirty = False
+        self.scroll_by(0)
+
+    def _get_row_height(self):
+        return self.properties.get("row_height", 25)
+
+    def _get_size(self):
+        # Scenes made before the Treeview had a viewport don't have these
+        return self.properties["transform"].get("size", [300, 400])
+
+    ## Scrolling
+    def get_max_scroll(self):
+        return max(0, len(self.rows)*self._get_row_height() - self._get_size()[1])
+
+    def scroll_to(self, pixels):
+        self.scroll = min(max(0, pixels), self.get_max_scroll())
+
+    def scroll_by(self, pixels):
+        self.scroll_to(self.scroll + pixels)
+
+    def _get_row_at(self, pos):
+        # The row under a point on the screen, or None
+        x, y       = self.runtime_data["rendererpos"]
+        w, h       = self._get_size()
+        if not (x <= pos[0] < x + w and y <= pos[1] < y + h):
+            return None
+        row = int((pos[1] - y + self.scroll) // self._get_row_height())
+        return row if row < len(self.rows) else None
+
+    ## Drawing
+    def _draw_rows(self):
+        row_height = self._get_row_height()
+        height     = self._get_size()[1]
+        first      = int(self.scroll // row_height)
+        last       = min(len(self.rows), math.ceil((self.scroll + height) / row_height))
+        amount     = math.ceil(height / row_height) + 1
+        while len(self.slots) < amount:
+            self.slots.append(TextHandle())
+
+        x, y       = self.runtime_data["rendererpos"]
+        layer      = self.properties["transform"]["layer"] + 10
+        for i in range(first, last):
+            depth, name, has_kids, path = self.rows[i]
+            # Rows keep the same slot while they're on screen, so scrolling only relayouts the rows that come in
             self.screen.render(
-                text    = f"{'| '*layer}{_have_kid}{i}",
-                pos     = _pos,
+                text    = f"{'| '*depth}{'v ' if has_kids else ''}{name}",
+                pos     = [x, y + i*row_height - self.scroll],
                 anchor  = "",
-                layer   = 10+id,
-                blit_in = self.window_id
+                layer   = layer,
+                blit_in = self.window_id,
+                handle  = self.slots[i % amount]
             )
-            id      += 1
-            _pos[1] += 25
-            if i in self.revealed:
-                _pos     = self._rlayer(data[i], _pos, layer+1)
-        return _pos
 
     def update(self, delta):
         super().update(delta)
-        # TBA
-        self.treechildren = self.properties["children"]
-        self.revealed     = []
-        
+        if self.properties["children"] is not self.treechildren:
+            self.treechildren = self.properties["children"]
+            self.rows_dirty   = True
+        if self.rows_dirty:
+            self._build_rows()
+
+        if not self.properties["visible"]:
+            return
+        scroll = engine.event.mouse_scroll
+        if (scroll or MOUSEUP in engine.events) and self._get_row_at(engine.mpos) is not None:
+            if scroll:
+                self.scroll_by(-scroll*self._get_row_height())
+            if MOUSEUP in engine.events:
+                depth, name, has_kids, path = self.rows[self._get_row_at(engine.mpos)]
+                if has_kids:
+                    self.toggle(path)
+                self.call("_row_clicked", path)
+        self.draw()
+
+    def draw(self):
         if self.properties["visible"]:
-            self._rlayer(self.treechildren, self.runtime_data["rendererpos"].copy())
\ No newline at end of file
+            self._draw_rows()
+
+    def _hide(self):
+        for handle in self.slots:
+            handle.hide()
+        super()._hide()
+
+    def free(self):
+        for handle in self.slots:
+            handle.delete()
+        self.slots = []
+        super().free()
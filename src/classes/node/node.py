@@ -18,9 +18,16 @@ class Node(Object, NodeMixin):
     
     The `self` value in these functions is.. the node the script is attached to. You cannot replace Node functions with a script.
 
+    The `process_mode` property decides if a Node (and its children) get updated:
+    `inherit` (default, same as the parent), `pausable` (stops while the scene is paused), `always`,
+    `paused` (the branch is frozen but stays on screen, it's only redrawn), `disabled` (the branch is frozen and hidden)
+    and `when_visible` (only updated while the `visible` property is true).
+
     There is nothing to do with it. The only useful thing to do with it is run a script with it, and no more.
     """
     
+    in_physics     = False # Stepped by the physics stepper (Area2D)
+
     node_base_data = {
         "prop":   {},
         "data":   {},
@@ -33,10 +40,40 @@ class Node(Object, NodeMixin):
 
     def __init__(self, data=node_base_data, parent=None):
         self.parent      = parent
+        self.pool        = None # The NodePool this node goes back to when freed (see classes/Scene.py)
         self.screen      = engine.interface
         self.resourceman = engine.resource_loader
         self.window_id   = engine.interface.main_surf_id
         super().__init__(data)
 
     def update(self, delta):
-        self._process(delta)
\ No newline at end of file
+        self._process(delta)
+    
+    def free(self):
+        """Free this node and its children. They stop running now, and are removed from the scene at the end of the frame."""
+        if self.pool:
+            return self.pool.release(self)
+        if self.runtime_data.get("queued_free"):
+            return
+        self.runtime_data["queued_free"] = True
+        for child in self.children:
+            child.free()
+        super().free()
+        if self.scene:
+            self.scene.queue_free(self)
+    
+    def _redraw(self):
+        # Draw this node again without updating it, called every frame while its branch is paused
+        pass
+    
+    def _hide(self):
+        # Hide whatever this node keeps on screen, called when its branch gets disabled
+        pass
+    
+    def _show(self):
+        # Undo `_hide()`, called when its branch runs again
+        pass
+    
+    def _pool_reset(self):
+        # Reset what this node keeps outside of its properties, called when a NodePool hands it out again
+        pass
\ No newline at end of file
@@ -12,63 +12,82 @@ class Area2D(PhysicsBody2D):
     ## An Area node.
     
     This node has a rectangular hitbox, which won't stop if collided with any bodies. Useful for things like triggers.
+    The hitbox is kept in the scene's spatial hash (`Scene.collision_grid`), so only the areas in the same cells are checked.
+    Its bounds are also kept in `Scene.collision_bounds`, which checks them against many areas at once.
+    Only the areas whose branch ran in the last scene update are stepped, so paused, disabled
+    and invisible `when_visible` branches don't move.
     """
+    in_physics = True
 
     def _check_overlap(self, rect1, rect2):
         # Use AABB
         return (
-            rect1.properties["transform"]["pos"][0] < rect2.properties["transform"]["pos"][0] + rect2.properties["transform"]["size"][0] and
-            rect1.properties["transform"]["pos"][0] + rect1.properties["transform"]["size"][0] > rect2.properties["transform"]["pos"][0] and
-            rect1.properties["transform"]["pos"][1] < rect2.properties["transform"]["pos"][1] + rect2.properties["transform"]["size"][1] and
-            rect1.properties["transform"]["pos"][1] + rect1.properties["transform"]["size"][1] > rect2.properties["transform"]["pos"][1]
+            rect1.x < rect2.x + rect2.w and
+            rect1.x + rect1.w > rect2.x and
+            rect1.y < rect2.y + rect2.h and
+            rect1.y + rect1.h > rect2.y
         )
 
     def __init__(self, data=CanvasItem.node_base_data, parent=None):
         super().__init__(data,parent)
         self._phys_init()
+        self.dim                            = None
         self.remap_dim()
         self.id                             = f"{self.to_string()}NodeColA{self.w*self.h}"
         self.scene.nodes_collision[self.id] = self
     
     def remap_dim(self):
-        self.x,self.y,self.w,self.h = self.properties["transform"]["pos"][0], self.properties["transform"]["pos"][1], self.properties["transform"]["size"][0], self.properties["transform"]["size"][1]
+        pos, size = self.properties["transform"]["pos"], self.properties["transform"]["size"]
+        dim       = (pos[0], pos[1], size[0], size[1])
+        if dim != self.dim:
+            # Moved or resized, update the broadphase
+            self.dim                    = dim
+            self.x,self.y,self.w,self.h = dim
+            self.scene.collision_grid.insert(self, *dim)
+            self.scene.collision_bounds.set(self, *dim)
     
     def colliderect(self, rect): return self._check_overlap(self, rect)
 
     def collidelist(self, rect_list):
-        id = 0
-        for i in rect_list:
-            if self._check_overlap(self, i): return id
-            else: id+=1
-        return -1
+        return self.scene.collision_bounds.first_overlapping(self, rect_list)
 
     def collidelistall(self, rect_list):
-        il = []
-        for i in rect_list:
-            if self._check_overlap(self, i): il.append(i)
-        return il
+        return self.scene.collision_bounds.overlapping(self, rect_list)
     
-    def get_all_rects_nearby(self, rang=500):
-        il = []
-        for i in self.scene.nodes_collision:
-            node = self.scene.nodes_collision[i]
-            # rang = The range in pixels that this rectangle can be in to count
-
-            if node == self: continue
-
-            if abs(node.x - node.x) < rang:
-                if abs(node.y - node.y) < rang:
-                    il.append(node)
-        return il
+    def get_all_rects_nearby(self, rang=0):
+        # rang = Extra range in pixels around this rectangle to look for areas in
+        return self.scene.collision_grid.query(self.x - rang, self.y - rang, self.w + rang*2, self.h + rang*2, self)
     
-    def update(self, delta):
-        super().update(delta)
+    def _physics_process(self, step, collided=None):
+        # Called by the physics stepper (`engine.physics`) at a fixed rate, not every frame
+        # The stepper passes the areas this one overlaps, found for the whole scene in one pass
+        if collided is None:
+            self.remap_dim()
+            collided = self.collidelistall(self.get_all_rects_nearby())
+        self._physics_update(collided, collided)  # Update physics based on nearby rectangles and collided ones
+        self.call("_physics_process", step)
 
+    def _hide(self):
+        # A disabled area doesn't collide
+        self.scene.nodes_collision.pop(self.id, None)
+        self.scene.collision_grid.remove(self)
+        self.scene.collision_bounds.remove(self)
+        self.dim = None
+        super()._hide()
+    
+    def _show(self):
+        self.scene.nodes_collision[self.id] = self
         self.remap_dim()
-        nearby   = self.get_all_rects_nearby()
-        collided = self.collidelistall(nearby)
-        self._physics_update(nearby, collided)  # Update physics based on nearby rectangles and collided ones
+        super()._show()
+
+    def _pool_reset(self):
+        # Its parked bounds are stale, so it's put back in the broadphase on its next step
+        self.dim = None
+        super()._pool_reset()
 
     def free(self):
-        self.scene.nodes_collision.pop(self.id)
+        if not self.pool:
+            self.scene.nodes_collision.pop(self.id, None)
+            self.scene.collision_grid.remove(self)
+            self.scene.collision_bounds.remove(self)
         super().free()
\ No newline at end of file
@@ -7,12 +7,41 @@ import classes.Singleton as engine
 
 ## Node
 class PhysicsBody2D(Node2D):
+    """
+    ## A 2D physics body.
+
+    The base of every node with physics. Physics run at a fixed rate (`phys_tickrate` CVar), so `motion` is in pixels per physics step.
+    Between two steps, the body is rendered at a position interpolated from the last two steps.
+    To move it somewhere without it sliding there, use `teleport()`, or call `reset_interpolation()` after setting its position.
+
+    You can make a script have an `_physics_process(self, step)` function. This will run every physics step.
+    """
+
     def _phys_init(self):
         self.should_stop = True
         self._onf        = False
         self._onw        = False
         self.weight      = 1
         self.motion      = [0, 0]
+        self.prev_pos    = self.properties["transform"]["pos"][:]
+
+    def _pool_reset(self):
+        # Handed out again, so it starts still, where its properties put it
+        self._onf     = False
+        self._onw     = False
+        self.motion   = [0, 0]
+        self.reset_interpolation()
+        super()._pool_reset()
+    
+    def reset_interpolation(self):
+        """Render the body at its current position until the next physics step."""
+        self.prev_pos = self.properties["transform"]["pos"][:]
+    
+    def teleport(self, pos):
+        """Move the body to `pos` instantly, without interpolating from where it was."""
+        self.properties["transform"]["pos"][:] = pos
+        self.reset_interpolation()
+        self.invalidate_transform()
 
     def if_on_floor(self): return self._onf 
     def if_on_wall(self):  return self._onw
@@ -36,7 +65,14 @@ class PhysicsBody2D(Node2D):
         
         self._handle_motion(bounce_mode)
     
+    def _get_local_pos(self):
+        # Interpolate between the last two physics steps
+        pos, prev = self.properties["transform"]["pos"], self.prev_pos
+        alpha     = engine.physics.alpha
+        return [prev[0] + (pos[0] - prev[0]) * alpha, prev[1] + (pos[1] - prev[1]) * alpha]
+    
     def _handle_motion(self, bounce_mode=False):
+        self.prev_pos = self.properties["transform"]["pos"][:]
         self.properties["transform"]["pos"][0] += self.motion[0]
         self.properties["transform"]["pos"][1] += self.motion[1]
         
@@ -1,5 +1,5 @@
 ## Import all the libraries
-import pyglet as pg, gc, struct, types
+import pyglet as pg, struct, types
 from anytree import NodeMixin
 from SpecialIsResourceDataLoadable import IS_IT as IS_EXECUTABLE
 import classes.Singleton as engine
@@ -48,26 +48,47 @@ class Object:
         self.runtime_data     = {}
         engine.obj_ids    += 1
         self.script           = None
+        self.namespace        = {}
+        self.callbacks        = {}
+        self.has_process      = False
         self._init_script()
         self._onready()
     
     ## Script related
     def call(self, method, *args):
-        if self.script:
-            if method in self.script.namespace:
-                mobj = types.MethodType(self.script.namespace[method], self)
-                if len(args) == 0:
-                    return mobj() 
-                else:             
-                    return mobj(*args)
+        callback = self.callbacks.get(method)
+        if callback:
+            return callback(*args)
+    
+    def has_callback(self, method):
+        return method in self.callbacks
 
     def call_deferred(self, method, args):
         self.call_deferr_list.append([method, args])
     
     def _init_script(self):
         if self.scriptpath:
-            self.script = engine.resource_loader.load(self.scriptpath)
-            self.script.init_param(self.properties)
+            self.script    = engine.resource_loader.load(self.scriptpath)
+            self.namespace = self.script.init_param(self.properties) # Every object gets its own namespace
+            self._bind_script()
+    
+    def _bind_script(self):
+        # Bind the script functions to this object once, instead of on every call
+        # Call this again if the namespace gets swapped (or use `reload_script()`)
+        self.callbacks   = {
+            name: types.MethodType(value, self)
+            for name, value in self.namespace.items()
+            if isinstance(value, types.FunctionType)
+        }
+        self.has_process = "_process" in self.callbacks
+    
+    def reload_script(self):
+        """Load and run the script again (for example after `memcl` cleared the resources), and rebind its functions."""
+        self.script      = None
+        self.namespace   = {}
+        self.callbacks   = {}
+        self.has_process = False
+        self._init_script()
     
     def _onready(self):
         self.call("_onready")
@@ -78,7 +99,8 @@ class Object:
             return
         
         # Call the process function
-        self.call("_process", delta)
+        if self.has_process:
+            self.callbacks["_process"](delta)
 
         # Call any deferred functions
         for i in self.call_deferr_list:
@@ -87,9 +109,8 @@ class Object:
     
     ## Other
     def _free(self):
+        # No garbage collection pass here, this runs for every freed node. Reference counting frees it once nothing points to it
         del self.data, self.properties
-        del self
-        gc.collect()
     
     def free(self):
         self.stop_running = True
@@ -1,7 +1,7 @@
 ## Import all the libraries 
 import pyglet as pg
 import Data, gc
-from classes             import UI, Save, Event, Resources, CV, Scene, ConHost, Clock, fpsdisp
+from classes             import UI, Save, Event, Resources, CV, Scene, ConHost, Clock, fpsdisp, Physics
 from classes.ConHost     import printf
 from classes.KeyEntries  import key_entries
 from classes.Convenience import *
@@ -35,8 +35,10 @@ event           : Event.Event           = 0
 im_running      : bool                  = True          
 ignore_os       : bool                  = False
 ticks           : int                   = 0             
+show_fps        : bool                  = True          # Pushed by the save file (display/showfps)
 clock           : Clock.Time            = 0             
 scene           : Scene.Scene           = 0             
+physics         : Physics.Stepper       = 0             
 console         : ConHost.ConHost       = 0             
 cvars           : CV.CvarCollection     = 0             
 fps_display     : fpsdisp.FPSDisplay    = 0             
@@ -46,12 +48,13 @@ thm             : Resources.Theme       = 0
 
 ## Global functions
 def reload_engine(dir=None):
-    global savefile,resource_loader,cvars,console,thm,keys_pressed,keys_nheld,display,batch,icon,initialized,interface,event,im_running,ticks,clock,scene, global_stream, fps_display
+    global savefile,resource_loader,cvars,console,thm,keys_pressed,keys_nheld,display,batch,icon,initialized,interface,event,im_running,ticks,clock,scene, global_stream, fps_display, physics
     """Reload/Load the engine variables."""
     
     ## Save if possible
     if initialized:
-        savefile.save_data()
+        savefile.close()
+        resource_loader.close()
     
     ## Reload data and load cvars and print basic information
     gc.enable()
@@ -82,18 +85,27 @@ def reload_engine(dir=None):
         batch       = pg.graphics.Batch()
         interface   = UI.Interface()
     else:
+        # Free the old scene, retained sprites, nine-slices and quads stay on screen until their node is freed
+        scene.empty()
+
         # Empty the screen
         interface.fill(0)
 
         # Remove all sprites
         interface.draw_queue.clear()
         interface.label_queue.clear()
-        interface.sprite_used.clear()
+        interface.sprites.release_all()
+        interface.release_text()
 
         # Clear display and reset everything
         display.clear()
-        display.set_size(savefile.get("display/resolution")[0], savefile.get("display/resolution")[1])
         display.set_caption(Data.game_name)
+
+    ## Display settings, pushed by the save file when they change
+    savefile.subscribe("display/showfps",    _set_show_fps, True)
+    savefile.subscribe("display/resolution", _set_resolution)
+    savefile.subscribe("display/fullscreen", _set_fullscreen)
+    savefile.subscribe("display/vsync",      _set_vsync)
     
     icon_path = cvars.get("icon_file", "mem://unknown")
     icon      = resource_loader.load(icon_path).get()
@@ -105,6 +117,7 @@ def reload_engine(dir=None):
     clock         = Clock.Time()
     console       = ConHost.ConHost()
     global_stream = pg.media.Player()
+    physics       = Physics.Stepper()
     fps_display   = fpsdisp.FPSDisplay(display)
 
     ## Theme
@@ -126,6 +139,22 @@ def reload_engine(dir=None):
     ## Set flag to true
     initialized = True
 
+def _set_show_fps(value):
+    global show_fps
+    show_fps = value
+
+def _set_resolution(value):
+    if not display.fullscreen and tuple(display.get_size()) != tuple(value):
+        display.set_size(value[0], value[1])
+
+def _set_fullscreen(value):
+    if display.fullscreen != bool(value):
+        display.set_fullscreen(bool(value))
+
+def _set_vsync(value):
+    if display.vsync != bool(value):
+        display.set_vsync(bool(value))
+
 def load_new_scene(file):
     global scene
     """Load a new scene from a file path."""
@@ -146,7 +175,8 @@ def suicide():
         print("Error; the app could not be closed")
     im_running  = False
     i_have_died = True
-    savefile.save_data()
+    savefile.close()
+    resource_loader.close()
 
 def is_key_pressed(key_name):
     """Get if a key is pressed from its name entry. (Name; eg. 'moveup', 'movedown', etc...)"""
@@ -2,6 +2,161 @@
 import pyglet as pg
 import classes.Singleton as engine
 from classes.Constants import *
+from classes.Cache import LRUCache
+
+## Pool class.
+class Pool:
+    """
+    A free-list allocator for pooled pyglet objects (Sprites, Labels..).
+
+    Acquiring and releasing a slot is O(1). `used` holds the indices handed out since the last
+    `release_all()`, in the order they were acquired. (A dict used as an ordered set) When no slot is free,
+    the pool grows by one object made by the `factory` passed to `acquire()`.
+    """
+
+    def __init__(self, objects):
+        self.objects = objects
+        self.used    = {}
+        self.free    = list(reversed(self.objects.keys())) # Popped from the end, so slot 0 goes first
+    
+    def acquire(self, factory):
+        if self.free:
+            id  = self.free.pop()
+        else:
+            id  = len(self.objects)
+            self.objects[id] = factory()
+        self.used[id] = None
+        return id, self.objects[id]
+    
+    def release(self, id):
+        if self.used.pop(id, 0) is None:
+            self.objects[id].visible = False
+            self.free.append(id)
+    
+    def release_all(self):
+        for id in self.used:
+            self.objects[id].visible = False
+        # Pushed back in reverse so the next frame hands out the same slots in the same order
+        self.free.extend(reversed(self.used))
+        self.used.clear()
+
+## Retained sprite class.
+class Retained:
+    """
+    A persistent sprite handle, drawn with `Interface.retain()`.
+
+    Unlike the pooled sprites of `Interface.blit()`, this one isn't hidden by `Interface.fill()`.
+    It keeps its last state until it's drawn with different arguments, hidden or deleted.
+    """
+
+    def __init__(self):
+        self.sprite = None
+        self.key    = None
+        self.size   = (0, 0)
+    
+    def mark_dirty(self):
+        # Force the next `Interface.retain()` call to push everything again
+        self.key = None
+    
+    def hide(self):
+        if self.sprite and self.sprite.visible:
+            self.sprite.visible = False
+        self.key = None
+    
+    def delete(self):
+        if self.sprite:
+            self.sprite.delete()
+            self.sprite = None
+        self.key = None
+
+## Nine-slice class.
+class NineSlice:
+    """
+    A persistent handle for a themed 9-sliced rectangle, drawn with `Theme.draw_marginable_thing(..., handle=...)`.
+
+    All nine pieces live in one vertex list in the batch. The vertices are only rebuilt when the position, size,
+    anchor or window size changes, and the vertex list is only remade when the theme, themed thing or layer changes.
+    `order` is the draw order inside the layer, for handles that overlap (like a bar and its fill).
+    """
+
+    def __init__(self, order=0):
+        self.order     = order
+        self.vlist     = None
+        self.key       = None
+        self.group_key = None
+        self.regions   = None
+        self.size      = (0, 0)
+    
+    def mark_dirty(self):
+        self.key = None
+    
+    def delete(self):
+        if self.vlist:
+            self.vlist.delete()
+            self.vlist = None
+        self.key       = None
+        self.group_key = None
+
+## Text handle class.
+class TextHandle:
+    """
+    A persistent label handle, drawn with `Interface.render(..., handle=...)`.
+
+    The text keeps the same label between frames, so pyglet only lays it out again when the text or font size changes.
+    The label goes back to the label pool when the handle is deleted. A handle that isn't rendered during a frame
+    is hidden before the frame is drawn.
+    """
+
+    def __init__(self):
+        self.label = None
+        self.id    = None
+        self.pool  = None
+        self.key   = None
+        self.size  = (0, 0)
+    
+    def mark_dirty(self):
+        self.key = None
+    
+    def hide(self):
+        if self.label and self.label.visible:
+            self.label.visible = False
+        self.key = None
+    
+    def delete(self):
+        if self.label:
+            self.pool.release(self.id)
+            self.label = None
+        self.key = None
+
+## Colored rectangle class.
+class ColorQuad:
+    """
+    A persistent handle for a solid colored rectangle, drawn with `Interface.rect()`.
+
+    It's a `pg.shapes.Rectangle` in the layer group, so it has no texture, and changing its color, size or
+    opacity only updates its vertices. It's only touched when the arguments (or the window size) change.
+    """
+
+    def __init__(self):
+        self.shape     = None
+        self.key       = None
+        self.group_key = None
+        self.size      = (0, 0)
+    
+    def mark_dirty(self):
+        self.key = None
+    
+    def hide(self):
+        if self.shape and self.shape.visible:
+            self.shape.visible = False
+        self.key = None
+    
+    def delete(self):
+        if self.shape:
+            self.shape.delete()
+            self.shape = None
+        self.key       = None
+        self.group_key = None
 
 ## UI Class.
 class Interface:
@@ -27,54 +182,67 @@ class Interface:
         self.making_surface  = False
         self.main_surf_id    = self.add_screen(self.screen, self.batch)
         self.is_doublebuffer = True
-        self.area_cache      = {}
+        self.area_cache      = LRUCache(self.cvars.get("ui_areacachesize", 1024))
         self.boilerimg       = pg.image.ImageData(1,1,"RGB", bytes([0,0,0]))
         self.label_pool      = {i: pg.text.Label("", font_size=15, batch=self.batch) for i in range(self.cvars.get("ui_labelpoolamount"))}
         self.sprite_pool     = {i: pg.sprite.Sprite(self.boilerimg, batch=self.batch) for i in range(self.cvars.get("ui_labelpoolamount"))}
-        self.label_used      = []
-        self.sprite_used     = []
+        self.labels          = Pool(self.label_pool)
+        self.sprites         = Pool(self.sprite_pool)
         self.draw_queue      = {}
-        self.anchors         = {}
+        self.anchors         = LRUCache(self.cvars.get("ui_anchorcachesize", 4096))
         self.label_queue     = {}
+        self.text_handles    = {}   # (text, size, surface, batch, nth time this frame) -> TextHandle, for `render()` calls without a handle
+        self.text_seen       = {}   # (text, size, surface, batch) -> times rendered this frame
+        self.text_used       = {}   # Handles rendered this frame
+        self.text_shown      = {}   # Handles rendered last frame
+        self.text_metrics    = LRUCache(self.cvars.get("ui_textcachesize", 2048)) # (text, font, size) -> content size
         self.layers          = {}
         self.layer_amount    = self.cvars.get("ui_layers") # -X ... X
 
         for i in range(-self.layer_amount,self.layer_amount):
             self.layers[i] = pg.graphics.Group(order=i)
     
+    @property
+    def label_used(self):
+        # Indices of the labels held by text handles
+        return self.labels.used
+    
+    @property
+    def sprite_used(self):
+        # Indices of the sprites blitted this frame
+        return self.sprites.used
+    
     def get_anchor(self,pos,blit_in,anchor,surf_w,surf_h,can_cache,rot,no_y_flip=False):
-        pos         = list(pos)
         if blit_in == MAIN_SCREEN:
             blit_in = self.main_surf_id
         screen = self.surfaces[blit_in]["screen"]
         win_w, win_h = screen.get_size()
-        anchor_id   = f"{anchor},win{win_w}x{win_h},surf{surf_w}x{surf_h},pos{pos},rot{True if rot else False}{no_y_flip}"
-
-        new_pos = pos.copy()
-        if can_cache:
-            if not anchor_id in self.anchors:
-                if not "bottom" in anchor and not no_y_flip:
-                    new_pos[1] = (win_h - surf_h) - pos[1] # Pyglet uses bottom-left for 0,0 while pygame uses top-left. I'm more familliar with pygame
-                if "right" in anchor:
-                    new_pos[0] = (win_w - surf_w) - pos[0]
-                if "centerX" in anchor:
-                    new_pos[0] = (win_w/2 - surf_w/2) + pos[0]
-                if "centerY" in anchor:
-                    new_pos[1] = (win_h/2 - surf_h/2) + pos[1]
-                if "center" in anchor:
-                    new_pos[0] = (win_w/2 - surf_w/2) + pos[0]
-                    new_pos[1] = (win_h/2 - surf_h/2) + pos[1]
-                if rot:
-                    new_pos[0]+=surf_w/2
-                    new_pos[1]+=surf_h/2
-                new_pos=[round(new_pos[0]),round(new_pos[1])]
-                self.anchors[anchor_id]=new_pos
-            else:
-                new_pos = self.anchors[anchor_id]
+        if not can_cache:
+            return list(pos)
+        anchor_id   = (anchor, win_w, win_h, surf_w, surf_h, pos[0], pos[1], bool(rot), no_y_flip)
+
+        new_pos = self.anchors.get(anchor_id)
+        if new_pos is None:
+            new_pos = list(pos)
+            if not "bottom" in anchor and not no_y_flip:
+                new_pos[1] = (win_h - surf_h) - pos[1] # Pyglet uses bottom-left for 0,0 while pygame uses top-left. I'm more familliar with pygame
+            if "right" in anchor:
+                new_pos[0] = (win_w - surf_w) - pos[0]
+            if "centerX" in anchor:
+                new_pos[0] = (win_w/2 - surf_w/2) + pos[0]
+            if "centerY" in anchor:
+                new_pos[1] = (win_h/2 - surf_h/2) + pos[1]
+            if "center" in anchor:
+                new_pos[0] = (win_w/2 - surf_w/2) + pos[0]
+                new_pos[1] = (win_h/2 - surf_h/2) + pos[1]
+            if rot:
+                new_pos[0]+=surf_w/2
+                new_pos[1]+=surf_h/2
+            new_pos=[round(new_pos[0]),round(new_pos[1])]
+            self.anchors.set(anchor_id, new_pos)
         return new_pos
 
-    def blit(self, surface, pos, clip=0, anchor="", opacity = 1, layer = 0, scroll=[0,0], scale=[1,1], blit_in=MAIN_SCREEN, can_cache = 1, rot = 0, use_pyglet_resource_directly = False, custom_id = None, return_obj=False, batchxt=None):
-        new_pos     = list(pos)[:]
+    def _get_blit_image(self, surface, clip, can_cache, use_pyglet_resource_directly, custom_id):
         if use_pyglet_resource_directly:
             path    = custom_id
             img     = surface
@@ -82,8 +250,6 @@ class Interface:
             path    = surface.get_path()
             img     = surface.get()
         img.subpixel = True
-        new_opacity  = int(opacity * 255)
-        new_clip     = clip
 
         if clip:
             ## Clipping
@@ -91,12 +257,71 @@ class Interface:
             cy = surface.height - cy - ch
 
             if can_cache:
-                id = f"{path}{cx}{cy}{cw}{ch}"
-                if not id in self.area_cache:
-                    img = img.get_region(cx, cy, cw, ch)
-                    self.area_cache[id] = img
-                else:
-                    img = self.area_cache[id]
+                id     = (path, cx, cy, cw, ch)
+                region = self.area_cache.get(id)
+                if region is None:
+                    region = img.get_region(cx, cy, cw, ch)
+                    self.area_cache.set(id, region)
+                img    = region
+        return img
+    
+    def _get_standalone(self, img):
+        # Scrolling reads past the edges of the image, which would show the images next to it in an atlas (or a clip)
+        # So regions get their own texture for it, made once
+        if not isinstance(img, pg.image.TextureRegion):
+            return img
+        id      = (img.owner, img.x, img.y, img.z, img.width, img.height)
+        texture = self.area_cache.get(id)
+        if texture is None:
+            texture = img.get_image_data().get_texture()
+            self.area_cache.set(id, texture)
+        return texture
+    
+    def _set_sprite(self, spr, img, new_pos, layer, scroll, scale, rot, new_opacity):
+        if not layer in self.layers: layer = 0
+        if scroll != [0, 0]:
+            img = self._get_standalone(img).get_region(
+                int(scroll[0] % img.width), 
+                int(scroll[1] % img.height),
+                img.width,                  
+                img.height                  
+            )
+
+        hsize        = [img.width//2,img.height//2]
+        if spr.x        != new_pos[0]:
+            spr.x        = new_pos[0]
+        if spr.y        != new_pos[1]:
+            spr.y        = new_pos[1]
+        if spr.image    != img:
+            if img != None:
+                try:
+                    if img.get_texture() == None:
+                        print("Warning; Image texture is None")
+                    else:
+                        spr.image = img
+                except Exception as e:
+                    print(f"Failed to assign sprite image: {e}")
+        if spr.z        != layer:
+            spr.z        = layer
+            spr.group    = self.layers[layer]
+        if spr.rotation != rot:
+            spr.rotation = rot
+        if spr.opacity  != new_opacity:
+            spr.opacity  = new_opacity
+        if spr.scale_x  != scale[0]:
+            spr.scale_x  = scale[0]
+        if spr.scale_y  != scale[1]:
+            spr.scale_y  = scale[1]
+        if rot:
+            if spr.image.anchor_x != hsize[0]:
+                spr.image.anchor_x = hsize[0]
+            if spr.image.anchor_y != hsize[1]:
+                spr.image.anchor_y = hsize[1]
+        spr.visible = True
+
+    def blit(self, surface, pos, clip=0, anchor="", opacity = 1, layer = 0, scroll=[0,0], scale=[1,1], blit_in=MAIN_SCREEN, can_cache = 1, rot = 0, use_pyglet_resource_directly = False, custom_id = None, return_obj=False, batchxt=None):
+        img          = self._get_blit_image(surface, clip, can_cache, use_pyglet_resource_directly, custom_id)
+        new_opacity  = int(opacity * 255)
         
         ## Anchoring
         if blit_in  == MAIN_SCREEN:
@@ -110,69 +335,100 @@ class Interface:
         ## Detect if i'm even visible and change position
         id_ = len(self.draw_queue)
         if not self.cull(img.width, img.height, new_pos, blit_in):
-            if not layer in self.layers: layer = 0
-            if scroll != [0, 0]:
-                img = img.get_region(
-                    int(scroll[0] % img.width), 
-                    int(scroll[1] % img.height),
-                    img.width,                  
-                    img.height                  
-                )
-
-            spr_id       = -1
-            hsize        = [img.width//2,img.height//2]
-            for i in self.sprite_pool:
-                if not i in self.sprite_used:     
-                    spr      = self.sprite_pool[i]
-                    spr_id   = i                  
-                    break                         
-            if spr_id == -1:
-                spr = pg.sprite.Sprite(
-                    self.boilerimg,
-                    batch    = batch,
-                    subpixel = True
-                )
-                id = len(self.sprite_pool)
-                self.sprite_pool[id] = spr
-                spr_id               = id 
-            if spr.x        != new_pos[0]:
-                spr.x        = new_pos[0]
-            if spr.y        != new_pos[1]:
-                spr.y        = new_pos[1]
-            if spr.image    != img:
-                if img != None:
-                    try:
-                        if img.get_texture() == None:
-                            print("Warning; Image texture is None")
-                        else:
-                            spr.image = img
-                    except Exception as e:
-                        print(f"Failed to assign sprite image: {e}")
-            if spr.z        != layer:
-                spr.z        = layer
-                spr.group    = self.layers[layer]
-            if spr.rotation != rot:
-                spr.rotation = rot
-            if spr.opacity  != new_opacity:
-                spr.opacity  = new_opacity
-            if spr.scale_x  != scale[0]:
-                spr.scale_x  = scale[0]
-            if spr.scale_y  != scale[1]:
-                spr.scale_y  = scale[1]
-            if rot:
-                if spr.image.anchor_x != hsize[0]:
-                    spr.image.anchor_x = hsize[0]
-                if spr.image.anchor_y != hsize[1]:
-                    spr.image.anchor_y = hsize[1]
-            spr.visible = True
+            spr_id, spr  = self.sprites.acquire(lambda: pg.sprite.Sprite(
+                self.boilerimg,
+                batch    = batch,
+                subpixel = True
+            ))
+            self._set_sprite(spr, img, new_pos, layer, scroll, scale, rot, new_opacity)
             self.draw_queue[id_] = spr
-            self.sprite_used.append(spr_id)
             if return_obj:
                 return img.width*scale[0], img.height*scale[1], spr
         if return_obj:
             return img.width*scale[0], img.height*scale[1], None
         return img.width*scale[0], img.height*scale[1]
     
+    def retain(self, handle, surface, pos, clip=0, anchor="", opacity = 1, layer = 0, scroll=[0,0], scale=[1,1], blit_in=MAIN_SCREEN, rot = 0):
+        """
+        Retained-mode version of `blit()`. The sprite of `handle` stays in the batch between frames,
+        and is only touched when one of the arguments (or the window size) is different from the last call.
+        """
+        if blit_in  == MAIN_SCREEN:
+            blit_in =  self.main_surf_id
+        screen       = self.surfaces[blit_in]["screen"]
+        key          = (
+            surface, pos[0], pos[1], tuple(clip) if clip else 0, anchor, opacity, layer,
+            scroll[0], scroll[1], scale[0], scale[1], rot, blit_in, screen.width, screen.height
+        )
+        if key == handle.key:
+            return handle.size
+        
+        img          = self._get_blit_image(surface, clip, True, False, None)
+        new_pos      = self.get_anchor(pos,blit_in,anchor,img.width*scale[0],img.height*scale[1],1, rot, False)
+        handle.key   = key
+        handle.size  = img.width*scale[0], img.height*scale[1]
+
+        if self.cull(img.width, img.height, new_pos, blit_in):
+            if handle.sprite:
+                handle.sprite.visible = False
+            return handle.size
+        
+        if not handle.sprite:
+            handle.sprite = pg.sprite.Sprite(
+                img,
+                batch    = self.surfaces[blit_in]["batch"],
+                group    = self.layers.get(layer, self.layers[0]),
+                subpixel = True
+            )
+        self._set_sprite(handle.sprite, img, new_pos, layer, scroll, scale, rot, int(opacity * 255))
+        return handle.size
+    
+    def rect(self, handle, pos, size, color, opacity = 1, anchor="", layer = 0, scale=[1,1], blit_in=MAIN_SCREEN, rot = 0):
+        """Draw a solid colored rectangle with a `ColorQuad` handle. Like `retain()`, it stays in the batch between frames."""
+        if blit_in  == MAIN_SCREEN:
+            blit_in =  self.main_surf_id
+        screen       = self.surfaces[blit_in]["screen"]
+        key          = (
+            pos[0], pos[1], size[0], size[1], tuple(color), opacity, anchor, layer,
+            scale[0], scale[1], rot, screen.width, screen.height
+        )
+        if key == handle.key:
+            return handle.size
+        
+        w, h         = size[0]*scale[0], size[1]*scale[1]
+        new_pos      = self.get_anchor(pos,blit_in,anchor,w,h,1,rot,False)
+        handle.key   = key
+        handle.size  = w, h
+
+        if self.cull(w, h, new_pos, blit_in):
+            if handle.shape:
+                handle.shape.visible = False
+            return handle.size
+        
+        # The group of a shape is set when it's made
+        if not layer in self.layers: layer = 0
+        if handle.group_key != (blit_in, layer):
+            handle.delete()
+            handle.key       = key
+            handle.group_key = (blit_in, layer)
+            handle.shape     = pg.shapes.Rectangle(
+                0, 0, w, h,
+                color = tuple(color[:3]),
+                batch = self.surfaces[blit_in]["batch"],
+                group = self.layers[layer]
+            )
+        shape          = handle.shape
+        shape.position = new_pos[0], new_pos[1]
+        shape.width    = w
+        shape.height   = h
+        shape.color    = tuple(color[:3])
+        shape.opacity  = int(opacity * 255)
+        shape.anchor_x = w/2 if rot else 0 # Rotate around the center, like sprites
+        shape.anchor_y = h/2 if rot else 0
+        shape.rotation = rot
+        shape.visible  = True
+        return handle.size
+    
     def cull(self, w, h, pos, blit_in):
         if blit_in  == MAIN_SCREEN:
             blit_in  =  self.main_surf_id
@@ -186,50 +442,76 @@ class Interface:
             pos[1] < -h
         )
 
-    def render(self, text, pos, blit_in=MAIN_SCREEN, layer=5, anchor="", size=15, rot=0, alpha=1, color=[255,255,255], return_obj=False, batchxt=None):
-        # TODO make good
-        id           = len(self.label_queue)
+    def render(self, text, pos, blit_in=MAIN_SCREEN, layer=5, anchor="", size=15, rot=0, alpha=1, color=[255,255,255], return_obj=False, batchxt=None, handle=None):
+        """
+        Render text. Pass a `TextHandle` to keep it on the same label between frames (nodes do this).
+        Calls without one get a handle keyed by their text, so the same string also stays on the same label.
+        """
         if blit_in  == MAIN_SCREEN:
             blit_in  =  self.main_surf_id
-        
-        screen       = self.surfaces[blit_in]["screen"]
         batch        = self.surfaces[blit_in]["tbatch"]
         if batchxt:
             batch    = batchxt
-        lbl_id       = -1
-        for i in self.label_pool:
-            if not i in self.label_used:
-                lbl      = self.label_pool[i]
-                lbl_id   = i                 
-                id       = i                 
-                break
-        if lbl_id == -1:
-            lbl = pg.text.Label(
+        if handle is None:
+            key      = (text, size, blit_in, id(batch))
+            nth      = self.text_seen.get(key, 0)
+            self.text_seen[key] = nth + 1
+            handle   = self.text_handles.get((key, nth))
+            if handle is None:
+                handle = self.text_handles[(key, nth)] = TextHandle()
+        self.text_used[handle] = None
+
+        screen       = self.surfaces[blit_in]["screen"]
+        key          = (text, pos[0], pos[1], blit_in, layer, anchor, size, rot, alpha, tuple(color), screen.width, screen.height)
+        if key == handle.key:
+            if return_obj:
+                return handle.size[0], handle.size[1], handle.label
+            return handle.size
+
+        if handle.label is None:
+            handle.pool             = self.labels
+            handle.id, handle.label = self.labels.acquire(lambda: pg.text.Label(
                 text,
-                font_size=15,
+                font_size=size,
                 z=layer,
                 batch=batch
-            )
-            self.label_pool[id] = lbl
-            lbl_id              = id
+            ))
+        lbl          = handle.label
+
+        # Measure the text once per font and size, not on every label it's put on
+        metrics_key  = (text, lbl.font_name, size)
+        metrics      = self.text_metrics.get(metrics_key)
+        if metrics is None:
+            if not lbl.text == text:
+                lbl.text = text
+            if not lbl.font_size == size:
+                lbl.font_size = size
+            metrics  = (lbl.content_width, lbl.content_height)
+            self.text_metrics.set(metrics_key, metrics)
+        width, height = metrics
         new_pos = self.get_anchor(
             list(pos),
             blit_in,
             anchor,
-            lbl.content_width,
-            lbl.content_height,
+            width,
+            height,
             True,
             rot
         )
-        color_new = [color[0],color[1],color[2],255]
+        handle.key   = key
+        handle.size  = round(width), round(height)
+        self.label_queue[handle.id] = lbl
+        
+        if self.cull(width, height, new_pos, blit_in):
+            lbl.visible = False
+            if return_obj:
+                return handle.size[0], handle.size[1], lbl
+            return handle.size
 
         if not lbl.text == text:
             lbl.text = text
-        
-        if self.cull(lbl.content_width, lbl.content_height, new_pos, blit_in):
-            self.label_pool[id].visible = False
-            return lbl.content_width, lbl.content_height
-
+        if not lbl.font_size == size:
+            lbl.font_size = size
         if not lbl.z    == layer:
             if not layer in self.layers: layer = 0
             lbl.z       = layer
@@ -238,31 +520,50 @@ class Interface:
             lbl.x = new_pos[0]
         if not lbl.y == new_pos[1]:
             lbl.y = new_pos[1]
-        if not lbl.font_size == size:
-            lbl.font_size = size
         if not lbl.rotation == rot:
             lbl.rotation = rot
-            hsize        = [lbl.content_width//2, lbl.content_height//2]
+            hsize        = [width//2, height//2]
             if lbl.anchor_x != hsize[0]:
                 lbl.anchor_x = hsize[0]
             if lbl.anchor_y != hsize[1]:
                 lbl.anchor_y = hsize[1]
-        if not lbl.color == color_new:
+        color_new = (color[0],color[1],color[2],255)
+        if not tuple(lbl.color) == color_new:
             lbl.color = color_new
         if not lbl.opacity == alpha*255:
             lbl.opacity = alpha*255
-
-        self.label_pool[id].visible = True
-        self.label_used.append(id)
-        self.label_queue[id] = lbl
+        lbl.visible = True
 
         if return_obj:
-            return round(lbl.content_width), round(lbl.content_height), lbl
+            return handle.size[0], handle.size[1], lbl
         else:
-            return round(lbl.content_width), round(lbl.content_height)
+            return handle.size
+    
+    def _hide_unused_text(self):
+        # Hide the text that was rendered last frame but not this one, and give back the labels of the ones without a handle
+        for handle in self.text_shown:
+            if not handle in self.text_used:
+                handle.hide()
+        for key in [key for key, handle in self.text_handles.items() if not handle in self.text_used]:
+            self.text_handles.pop(key).delete()
+        self.text_shown = self.text_used
+        self.text_used  = {}
+        self.text_seen.clear()
+    
+    def release_text(self):
+        """Hide every text handle and give back the labels of the ones `render()` made."""
+        for handle in self.text_shown:
+            handle.hide()
+        for handle in self.text_handles.values():
+            handle.delete()
+        self.text_handles.clear()
+        self.text_shown = {}
+        self.text_used  = {}
+        self.text_seen.clear()
     
     def flip(self):
         ## === 1. Draw batches ===
+        self._hide_unused_text()
         if not self.making_surface:
             for surf in self.surfaces.values():
                 surf["batch"].draw() 
@@ -282,14 +583,9 @@ class Interface:
         for i in self.surfaces: 
             screen = self.surfaces[i]["screen"]
             screen.clear()      
-        for lbl in self.label_used:
-            self.label_pool[lbl].visible  = False
-        for spr in self.sprite_used:
-            self.sprite_pool[spr].visible = False
-        self.label_used.clear() 
+        self.sprites.release_all() # Labels are kept by their text handles, see `render()`
         self.draw_queue.clear() 
         self.label_queue.clear()
-        self.sprite_used.clear()
     
     def close(self):
         for i in self.surfaces:
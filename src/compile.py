@@ -1,4 +1,5 @@
-import os, Data, shutil
+import os, Data, shutil, json
+from classes import Manifest, Pack
 
 Data._init()
 
@@ -8,6 +9,10 @@ og_specfile = open("Eklips.spec").read()
 with open("Eklips.spec", "w") as f:
     f.write(f"data_directory = '{Data.data_directory}'\n")
     f.write(f"game_name      = '{Data.game_name}'\n")
+    f.write(f"pack_file      = 'game.ekpak'\n")
+    # Everything else is read from the pack, these are read before the Loader (and its pack) exists
+    loose_files = [(path, os.path.dirname(path) or ".") for path in (Data.project_file, f"{Data.data_directory}/base_save.json") if os.path.isfile(path)]
+    f.write(f"loose_files    = {loose_files!r}\n")
     f.write(og_specfile)
 
 print(f" ~ Modifying Eklips setting")
@@ -15,6 +20,14 @@ og_eklfile = open("SpecialIsResourceDataLoadable.py").read()
 with open("SpecialIsResourceDataLoadable.py", "w") as f:
     f.write(f"IS_IT = True # This variable is so that the game can detect if it's an EXE or not (which are pretty much only onefile)")
 
+print(f" ~ Writing scene manifest")
+manifest_file = f"{Data.data_directory}/scenes.manifest"
+with open(manifest_file, "w") as f:
+    json.dump({**Manifest.scan_directory(Data.data_directory, "res://"), **Manifest.scan_directory("internal", "root://internal/")}, f)
+
+print(f" ~ Packing assets")
+Pack.write_pack("game.ekpak", {**Pack.collect(Data.data_directory, "res://"), **Pack.collect("internal", "root://internal/")})
+
 print(f" ~ Compiling Eklips build")
 shutil.rmtree("dist", ignore_errors=1)
 os.system("pyinstaller Eklips.spec")
@@ -23,6 +36,10 @@ print(f" ~ Reverting .spec")
 with open("Eklips.spec", "w") as f:
     f.writelines(og_specfile)
 
+print(f" ~ Removing scene manifest and asset pack")
+os.remove(manifest_file)
+os.remove("game.ekpak")
+
 print(f" ~ Reverting Eklips setting back to normal")
 with open("SpecialIsResourceDataLoadable.py", "w") as f:
     f.write(og_eklfile)
\ No newline at end of file